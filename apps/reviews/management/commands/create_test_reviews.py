@@ -37,7 +37,9 @@ class Command(BaseCommand):
         
         # 获取用户和已完成的任务
         users = list(User.objects.filter(is_active=True))
-        completed_tasks = list(Task.objects.filter(status=TaskStatus.COMPLETED))
+        completed_tasks = list(
+            Task.objects.filter(status=TaskStatus.COMPLETED).prefetch_related('collaborators')
+        )
         
         if len(users) < 2:
             self.stdout.write(
@@ -52,59 +54,64 @@ class Command(BaseCommand):
             return
         
         count = options['count']
-        created_count = 0
+        n = count // 2
+        before = Review.objects.count()
         
-        # 创建任务评价
-        for _ in range(count // 2):
-            task = random.choice(completed_tasks)
-            reviewer = random.choice(users)
-            
-            # 确保评价人不是任务参与者
-            if reviewer == task.owner or reviewer in task.collaborators.all():
-                continue
-            
-            # 检查是否已经评价过
-            if Review.objects.filter(
-                type=ReviewType.TASK,
-                task=task,
-                reviewer=reviewer
-            ).exists():
-                continue
-            
-            Review.objects.create(
+        # 预先批量抽取随机数，循环内只做实例组装
+        month = date(2024, 1, 1)
+        tasks = random.choices(completed_tasks, k=n)
+        task_reviewers = random.choices(users, k=n)
+        task_ratings = random.choices(range(6, 11), k=n)
+        task_anonymous = random.choices([True, False], k=n)
+        
+        # 一次性建好各任务的参与者集合，避免循环内反复查询 M2M
+        participant_ids = {
+            task.id: {task.owner_id} | {u.id for u in task.collaborators.all()}
+            for task in completed_tasks
+        }
+        
+        # 任务评价（评价人不能是任务参与者）
+        reviews = [
+            Review(
                 type=ReviewType.TASK,
                 task=task,
                 reviewer=reviewer,
-                rating=random.randint(6, 10),
+                rating=rating,
                 comment=f'这是对任务"{task.title}"的测试评价',
-                is_anonymous=random.choice([True, False])
+                is_anonymous=anonymous
+            )
+            for task, reviewer, rating, anonymous in zip(
+                tasks, task_reviewers, task_ratings, task_anonymous
             )
-            created_count += 1
+            if reviewer.id not in participant_ids[task.id]
+        ]
         
-        # 创建月度评价
-        for _ in range(count // 2):
-            reviewer = random.choice(users)
-            reviewee = random.choice([u for u in users if u != reviewer])
-            
-            # 检查是否已经评价过
-            if Review.objects.filter(
-                type=ReviewType.MONTHLY,
-                reviewer=reviewer,
-                reviewee=reviewee,
-                month=date(2024, 1, 1)
-            ).exists():
-                continue
-            
-            Review.objects.create(
+        # 月度评价
+        monthly_reviewers = random.choices(users, k=n)
+        monthly_ratings = random.choices(range(7, 11), k=n)
+        monthly_anonymous = random.choices([True, False], k=n)
+        
+        for reviewer, rating, anonymous in zip(
+            monthly_reviewers, monthly_ratings, monthly_anonymous
+        ):
+            # 拒绝采样选出不同于评价人的被评价人，避免每次迭代重建候选列表
+            while True:
+                reviewee = users[random.randrange(len(users))]
+                if reviewee.id != reviewer.id:
+                    break
+            reviews.append(Review(
                 type=ReviewType.MONTHLY,
                 reviewee=reviewee,
                 reviewer=reviewer,
-                rating=random.randint(7, 10),
+                rating=rating,
                 comment=f'这是对{reviewee.name}的月度评价',
-                month=date(2024, 1, 1),
-                is_anonymous=random.choice([True, False])
-            )
-            created_count += 1
+                month=month,
+                is_anonymous=anonymous
+            ))
+        
+        # 重复评价交给数据库唯一约束去重
+        Review.objects.bulk_create(reviews, batch_size=5000, ignore_conflicts=True)
+        created_count = Review.objects.count() - before
         
         self.stdout.write(
             self.style.SUCCESS(f'成功创建了 {created_count} 条评价记录')
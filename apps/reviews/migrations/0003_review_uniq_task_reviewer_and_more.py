@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-08-26 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(condition=models.Q(('type', 'task')), fields=('task', 'reviewer'), name='uniq_task_reviewer'),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(condition=models.Q(('type', 'monthly')), fields=('reviewer', 'reviewee', 'month'), name='uniq_monthly_reviewer_reviewee_month'),
+        ),
+    ]
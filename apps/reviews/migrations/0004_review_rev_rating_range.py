@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-08-26 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_review_uniq_task_reviewer_and_more'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.CheckConstraint(check=models.Q(('rating__gte', 1), ('rating__lte', 10)), name='rev_rating_range'),
+        ),
+    ]
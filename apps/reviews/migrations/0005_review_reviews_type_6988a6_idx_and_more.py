@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-08-26 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_review_rev_rating_range'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['type', 'task', 'reviewer'], name='reviews_type_6988a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['type', 'reviewee', 'month'], name='reviews_type_0cf6a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['reviewer', '-created_at'], name='reviews_reviewe_ae7fe9_idx'),
+        ),
+    ]
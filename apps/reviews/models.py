@@ -2,6 +2,7 @@
 Review models for OKR Performance System
 """
 from django.db import models
+from django.db.models import Q
 from django.core.validators import MinValueValidator, MaxValueValidator
 import uuid
 
@@ -57,6 +58,26 @@ class Review(models.Model):
         indexes = [
             models.Index(fields=['type', 'task']),
             models.Index(fields=['month']),
+            models.Index(fields=['type', 'task', 'reviewer']),
+            models.Index(fields=['type', 'reviewee', 'month']),
+            models.Index(fields=['reviewer', '-created_at']),
+        ]
+        constraints = [
+            # 数据库层面保证同一用户对同一任务/同一月度只能评价一次
+            models.UniqueConstraint(
+                fields=['task', 'reviewer'],
+                condition=Q(type='task'),
+                name='uniq_task_reviewer'
+            ),
+            models.UniqueConstraint(
+                fields=['reviewer', 'reviewee', 'month'],
+                condition=Q(type='monthly'),
+                name='uniq_monthly_reviewer_reviewee_month'
+            ),
+            models.CheckConstraint(
+                check=Q(rating__gte=1, rating__lte=10),
+                name='rev_rating_range'
+            ),
         ]
 
     def __str__(self):
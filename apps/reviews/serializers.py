@@ -3,6 +3,7 @@ Review serializers for OKR Performance System
 """
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from .models import Review, ReviewType
 from apps.tasks.models import Task
 
@@ -28,22 +29,29 @@ class ReviewSerializer(serializers.ModelSerializer):
             'rating', 'comment', 'is_anonymous', 'month', 'created_at'
         ]
         read_only_fields = ['id', 'reviewer', 'created_at']
-    
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 只在初始化时判断一次当前用户是否为管理员，避免每条评价重复判断
+        request = self.context.get('request')
+        self._show_anon_names = bool(
+            request and
+            getattr(request.user, 'is_authenticated', False) and
+            getattr(request.user, 'role', None) == 'admin'
+        )
+
     def get_reviewer_name(self, obj):
         """获取评价人姓名，如果是匿名评价则返回'匿名'"""
-        if obj.is_anonymous:
-            # 检查当前用户是否为管理员
-            request = self.context.get('request')
-            if request and request.user.is_authenticated and request.user.role == 'admin':
-                return obj.reviewer.name
-            return '匿名'
-        return obj.reviewer.name
-    
-    def validate_rating(self, value):
-        """验证评分范围"""
-        if not (1 <= value <= 10):
-            raise serializers.ValidationError("评分必须在1到10之间")
-        return value
+        if not obj.is_anonymous or self._show_anon_names:
+            return obj.reviewer.name
+        return '匿名'
+
+    def to_representation(self, instance):
+        """匿名评价时对非管理员隐藏评价人详细信息，只保留 reviewer_name"""
+        data = super().to_representation(instance)
+        if instance.is_anonymous and not self._show_anon_names:
+            data['reviewer'] = None
+        return data
     
     def validate(self, data):
         """验证评价数据"""
@@ -55,19 +63,7 @@ class ReviewSerializer(serializers.ModelSerializer):
             task = data['task']
             if not task.is_completed():
                 raise serializers.ValidationError("只能对已完成的任务进行评价")
-            
-            # 检查是否已经评价过该任务
-            request = self.context.get('request')
-            if request and request.user.is_authenticated:
-                existing_review = Review.objects.filter(
-                    type=ReviewType.TASK,
-                    task=task,
-                    reviewer=request.user
-                ).first()
-                
-                if existing_review and not self.instance:
-                    raise serializers.ValidationError("您已经对该任务进行过评价")
-        
+
         # 验证月度评价的逻辑
         elif data.get('type') == ReviewType.MONTHLY:
             if not data.get('reviewee'):
@@ -84,38 +80,21 @@ class TaskReviewCreateSerializer(serializers.ModelSerializer):
         model = Review
         fields = ['task', 'rating', 'comment', 'is_anonymous']
     
-    def validate_rating(self, value):
-        """验证评分范围"""
-        if not (1 <= value <= 10):
-            raise serializers.ValidationError("评分必须在1到10之间")
-        return value
-    
     def validate_task(self, value):
         """验证任务状态"""
         if not value.is_completed():
             raise serializers.ValidationError("只能对已完成的任务进行评价")
         return value
     
-    def validate(self, data):
-        """验证是否已经评价过该任务"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            existing_review = Review.objects.filter(
-                type=ReviewType.TASK,
-                task=data['task'],
-                reviewer=request.user
-            ).first()
-            
-            if existing_review:
-                raise serializers.ValidationError("您已经对该任务进行过评价")
-        
-        return data
-    
     def create(self, validated_data):
-        """创建任务评价"""
+        """创建任务评价（重复评价由数据库唯一约束保证）"""
         validated_data['type'] = ReviewType.TASK
         validated_data['reviewer'] = self.context['request'].user
-        return super().create(validated_data)
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError("您已经对该任务进行过评价")
 
 
 class MonthlyReviewCreateSerializer(serializers.ModelSerializer):
@@ -124,12 +103,6 @@ class MonthlyReviewCreateSerializer(serializers.ModelSerializer):
         model = Review
         fields = ['reviewee', 'rating', 'comment', 'is_anonymous', 'month']
     
-    def validate_rating(self, value):
-        """验证评分范围"""
-        if not (1 <= value <= 10):
-            raise serializers.ValidationError("评分必须在1到10之间")
-        return value
-    
     def validate_reviewee(self, value):
         """验证被评价人不能是自己"""
         request = self.context.get('request')
@@ -137,27 +110,15 @@ class MonthlyReviewCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("不能评价自己")
         return value
     
-    def validate(self, data):
-        """验证是否已经评价过该用户的该月度"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            existing_review = Review.objects.filter(
-                type=ReviewType.MONTHLY,
-                reviewee=data['reviewee'],
-                reviewer=request.user,
-                month=data['month']
-            ).first()
-            
-            if existing_review:
-                raise serializers.ValidationError("您已经对该用户的该月度进行过评价")
-        
-        return data
-    
     def create(self, validated_data):
-        """创建月度评价"""
+        """创建月度评价（重复评价由数据库唯一约束保证）"""
         validated_data['type'] = ReviewType.MONTHLY
         validated_data['reviewer'] = self.context['request'].user
-        return super().create(validated_data)
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError("您已经对该用户的该月度进行过评价")
 
 
 class TaskReviewSummarySerializer(serializers.Serializer):
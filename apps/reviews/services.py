@@ -1,7 +1,7 @@
 """
 Review services for OKR Performance System
 """
-from django.db.models import Avg, Count, Q
+from django.db.models import Count, Exists, OuterRef, Q, Sum
 from decimal import Decimal, ROUND_HALF_UP
 from .models import Review, ReviewType
 
@@ -12,72 +12,54 @@ class ReviewService:
     @staticmethod
     def calculate_average_rating(task_id):
         """计算任务平均评分"""
-        reviews = Review.objects.filter(
+        # 评分是整数，求和/计数用整数完成，只在出口转一次 Decimal
+        stats = Review.objects.filter(
             type=ReviewType.TASK,
             task_id=task_id
-        )
-        
-        if not reviews.exists():
+        ).aggregate(total=Sum('rating'), count=Count('id'))
+
+        if not stats['count']:
             return Decimal('0.00')
-        
-        avg_rating = reviews.aggregate(avg_rating=Avg('rating'))['avg_rating']
-        return Decimal(str(avg_rating)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+        return (Decimal(stats['total']) / Decimal(stats['count'])).quantize(
+            Decimal('0.01'), rounding=ROUND_HALF_UP
+        )
     
     @staticmethod
     def calculate_weighted_average_rating(task_id):
         """计算任务的加权平均评分（管理员评分权重更高）"""
-        admin_reviews = Review.objects.filter(
-            type=ReviewType.TASK,
-            task_id=task_id,
-            reviewer__role='admin'
-        )
-        member_reviews = Review.objects.filter(
+        # 角色条件合并进一次过滤，一条聚合查询、一个 users JOIN 拿到两组统计
+        stats = Review.objects.filter(
             type=ReviewType.TASK,
             task_id=task_id,
-            reviewer__role='member'
-        )
-        
-        admin_stats = admin_reviews.aggregate(
-            avg_rating=Avg('rating'),
-            count=Count('id')
+            reviewer__role__in=['admin', 'member']
+        ).aggregate(
+            admin_sum=Sum('rating', filter=Q(reviewer__role='admin')),
+            admin_count=Count('id', filter=Q(reviewer__role='admin')),
+            member_sum=Sum('rating', filter=Q(reviewer__role='member')),
+            member_count=Count('id', filter=Q(reviewer__role='member'))
         )
-        member_stats = member_reviews.aggregate(
-            avg_rating=Avg('rating'),
-            count=Count('id')
-        )
-        
-        admin_avg = admin_stats['avg_rating'] or 0
-        member_avg = member_stats['avg_rating'] or 0
-        admin_count = admin_stats['count'] or 0
-        member_count = member_stats['count'] or 0
-        
-        if admin_count == 0 and member_count == 0:
-            return Decimal('0.00')
-        
-        # 管理员评分权重为2，普通成员权重为1
-        admin_weight = 2
-        member_weight = 1
-        
-        total_weighted_score = (
-            Decimal(str(admin_avg)) * admin_count * admin_weight +
-            Decimal(str(member_avg)) * member_count * member_weight
-        )
-        total_weight = admin_count * admin_weight + member_count * member_weight
-        
-        if total_weight == 0:
+
+        admin_sum = stats['admin_sum'] or 0
+        member_sum = stats['member_sum'] or 0
+
+        # 管理员评分权重为2，普通成员权重为1；评分是整数，分子分母先用整数算好
+        numerator = admin_sum * 2 + member_sum * 1
+        denominator = stats['admin_count'] * 2 + stats['member_count'] * 1
+
+        if denominator == 0:
             return Decimal('0.00')
-        
-        weighted_average = (total_weighted_score / total_weight).quantize(
+
+        return (Decimal(numerator) / Decimal(denominator)).quantize(
             Decimal('0.01'), rounding=ROUND_HALF_UP
         )
-        
-        return weighted_average
     
     @staticmethod
-    def calculate_task_rating_adjustment(task_id):
+    def calculate_task_rating_adjustment(task_id, weighted_average=None):
         """计算任务评分调整系数"""
-        weighted_average = ReviewService.calculate_weighted_average_rating(task_id)
-        
+        if weighted_average is None:
+            weighted_average = ReviewService.calculate_weighted_average_rating(task_id)
+
         if weighted_average == 0:
             return Decimal('0.700')  # 没有评分时使用基础系数0.7
         
@@ -99,9 +81,14 @@ class ReviewService:
     @staticmethod
     def get_task_reviews_summary(task_id):
         """获取任务评价汇总信息"""
-        reviews = Review.objects.filter(type=ReviewType.TASK, task_id=task_id)
-        
-        if not reviews.exists():
+        # 一条聚合查询同时得到总数和各角色数量，顺带替代 exists() 判断
+        stats = Review.objects.filter(type=ReviewType.TASK, task_id=task_id).aggregate(
+            total_count=Count('id'),
+            admin_count=Count('id', filter=Q(reviewer__role='admin')),
+            member_count=Count('id', filter=Q(reviewer__role='member'))
+        )
+
+        if stats['total_count'] == 0:
             return {
                 'total_count': 0,
                 'admin_count': 0,
@@ -110,16 +97,17 @@ class ReviewService:
                 'weighted_average': Decimal('0.00'),
                 'adjustment_factor': Decimal('0.700')
             }
-        
-        # 基本统计
-        total_count = reviews.count()
-        admin_count = reviews.filter(reviewer__role='admin').count()
-        member_count = reviews.filter(reviewer__role='member').count()
-        
-        # 计算评分
+
+        total_count = stats['total_count']
+        admin_count = stats['admin_count']
+        member_count = stats['member_count']
+
+        # 计算评分；加权平均只算一次，调整系数直接复用
         average_rating = ReviewService.calculate_average_rating(task_id)
         weighted_average = ReviewService.calculate_weighted_average_rating(task_id)
-        adjustment_factor = ReviewService.calculate_task_rating_adjustment(task_id)
+        adjustment_factor = ReviewService.calculate_task_rating_adjustment(
+            task_id, weighted_average=weighted_average
+        )
         
         return {
             'total_count': total_count,
@@ -199,19 +187,19 @@ class ReviewService:
     def get_reviewable_users_for_monthly(reviewer, month):
         """获取可以进行月度评价的用户列表"""
         from django.contrib.auth import get_user_model
-        
+
         User = get_user_model()
-        
-        # 获取所有活跃用户，排除自己
-        all_users = User.objects.filter(is_active=True).exclude(id=reviewer.id)
-        
-        # 排除已经评价过的用户
-        reviewed_user_ids = Review.objects.filter(
+
+        # 用 Exists 子查询排除已评价过的用户，单条 SQL 即可完成
+        already_reviewed = Review.objects.filter(
             type=ReviewType.MONTHLY,
             reviewer=reviewer,
-            month=month
-        ).values_list('reviewee_id', flat=True)
-        
-        reviewable_users = all_users.exclude(id__in=reviewed_user_ids)
-        
-        return reviewable_users
\ No newline at end of file
+            month=month,
+            reviewee=OuterRef('pk')
+        )
+
+        return User.objects.filter(is_active=True).exclude(
+            id=reviewer.id
+        ).annotate(
+            _reviewed=Exists(already_reviewed)
+        ).filter(_reviewed=False)
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Review background tasks for OKR Performance System
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.cache import cache
+from django.db.models import F, Value
+from django.db.models.functions import Round
+
+from apps.tasks.models import Task
+from apps.tasks.services import score_distribution_cache_key
+from .services import ReviewService
+
+
+def recompute_task_scores(task_id):
+    """重新计算任务的评分调整系数及个人分值分配
+
+    通过 transaction.on_commit 在评价写入提交后执行，
+    接入任务队列（如 Celery）时可直接包装为异步任务。
+    """
+    try:
+        task = Task.objects.select_related('score_distribution').get(id=task_id)
+    except Task.DoesNotExist:
+        return
+
+    # 计算新的加权平均评分和调整系数，并写入任务上的缓存列
+    weighted_average = ReviewService.calculate_weighted_average_rating(task_id)
+    adjustment_factor = ReviewService.calculate_task_rating_adjustment(
+        task_id, weighted_average=weighted_average
+    )
+    task.cached_weighted_rating = weighted_average
+    task.cached_adjustment_factor = adjustment_factor
+    task.save(update_fields=['cached_weighted_rating', 'cached_adjustment_factor'])
+
+    # 更新任务的分值分配（如果存在）
+    if not hasattr(task, 'score_distribution'):
+        return
+
+    distribution = task.score_distribution
+
+    # 重新计算调整后的分值
+    base_total_score = Decimal(str(task.difficulty_score)) * distribution.penalty_coefficient
+    adjusted_total_score = (base_total_score * adjustment_factor).quantize(
+        Decimal('0.01'), rounding=ROUND_HALF_UP
+    )
+
+    # 更新分值分配
+    distribution.total_score = adjusted_total_score
+    distribution.save()
+
+    # 重新分配个人分值：单条 UPDATE 在数据库内完成，无需取回任何行
+    distribution.allocations.update(
+        adjusted_score=Round(
+            F('percentage') * Value(adjusted_total_score) / Value(Decimal('100')),
+            precision=2
+        )
+    )
+
+    # 分值变动后失效分值分配读取缓存
+    cache.delete(score_distribution_cache_key(task_id))
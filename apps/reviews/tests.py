@@ -19,8 +19,9 @@ User = get_user_model()
 class ReviewModelTest(TestCase):
     """评价模型测试"""
     
-    def setUp(self):
-        self.admin_user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_user(
             username='admin@test.com',
             email='admin@test.com',
             password='testpass123',
@@ -29,7 +30,7 @@ class ReviewModelTest(TestCase):
             role='admin'
         )
         
-        self.member_user = User.objects.create_user(
+        cls.member_user = User.objects.create_user(
             username='member@test.com',
             email='member@test.com',
             password='testpass123',
@@ -38,14 +39,14 @@ class ReviewModelTest(TestCase):
             role='member'
         )
         
-        self.task = Task.objects.create(
+        cls.task = Task.objects.create(
             title='测试任务',
             description='测试任务描述',
             difficulty_score=5,
             revenue_amount=Decimal('1000.00'),
             status=TaskStatus.COMPLETED,
-            owner=self.member_user,
-            created_by=self.admin_user
+            owner=cls.member_user,
+            created_by=cls.admin_user
         )
     
     def test_create_task_review(self):
@@ -101,8 +102,9 @@ class ReviewModelTest(TestCase):
 class ReviewServiceTest(TestCase):
     """评价服务测试"""
     
-    def setUp(self):
-        self.admin_user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_user(
             username='admin@test.com',
             email='admin@test.com',
             password='testpass123',
@@ -111,7 +113,7 @@ class ReviewServiceTest(TestCase):
             role='admin'
         )
         
-        self.member1 = User.objects.create_user(
+        cls.member1 = User.objects.create_user(
             username='member1@test.com',
             email='member1@test.com',
             password='testpass123',
@@ -120,7 +122,7 @@ class ReviewServiceTest(TestCase):
             role='member'
         )
         
-        self.member2 = User.objects.create_user(
+        cls.member2 = User.objects.create_user(
             username='member2@test.com',
             email='member2@test.com',
             password='testpass123',
@@ -129,57 +131,58 @@ class ReviewServiceTest(TestCase):
             role='member'
         )
         
-        self.task = Task.objects.create(
+        cls.task = Task.objects.create(
             title='测试任务',
             description='测试任务描述',
             difficulty_score=6,
             revenue_amount=Decimal('1500.00'),
             status=TaskStatus.COMPLETED,
-            owner=self.member1,
-            created_by=self.admin_user
+            owner=cls.member1,
+            created_by=cls.admin_user
         )
     
     def test_calculate_average_rating(self):
         """测试计算平均评分"""
-        # 创建几个评价
-        Review.objects.create(
-            type=ReviewType.TASK,
-            task=self.task,
-            reviewer=self.admin_user,
-            rating=8,
-            comment='很好'
-        )
-        
-        Review.objects.create(
-            type=ReviewType.TASK,
-            task=self.task,
-            reviewer=self.member2,
-            rating=6,
-            comment='一般'
-        )
+        # 一次 bulk_create 建好评价
+        Review.objects.bulk_create([
+            Review(
+                type=ReviewType.TASK,
+                task=self.task,
+                reviewer=self.admin_user,
+                rating=8,
+                comment='很好'
+            ),
+            Review(
+                type=ReviewType.TASK,
+                task=self.task,
+                reviewer=self.member2,
+                rating=6,
+                comment='一般'
+            ),
+        ])
         
         avg_rating = ReviewService.calculate_average_rating(self.task.id)
         self.assertEqual(avg_rating, Decimal('7.00'))
     
     def test_calculate_weighted_average_rating(self):
         """测试计算加权平均评分"""
-        # 管理员评价
-        Review.objects.create(
-            type=ReviewType.TASK,
-            task=self.task,
-            reviewer=self.admin_user,
-            rating=8,
-            comment='管理员评价'
-        )
-        
-        # 普通成员评价
-        Review.objects.create(
-            type=ReviewType.TASK,
-            task=self.task,
-            reviewer=self.member2,
-            rating=6,
-            comment='成员评价'
-        )
+        # 管理员评价和普通成员评价一次写入
+        Review.objects.bulk_create([
+            Review(
+                type=ReviewType.TASK,
+                task=self.task,
+                reviewer=self.admin_user,
+                rating=8,
+                comment='管理员评价'
+            ),
+            Review(
+                type=ReviewType.TASK,
+                task=self.task,
+                reviewer=self.member2,
+                rating=6,
+                comment='成员评价'
+            ),
+        ])
         
         # 加权平均 = (8*1*2 + 6*1*1) / (1*2 + 1*1) = 22/3 = 7.33
         weighted_avg = ReviewService.calculate_weighted_average_rating(self.task.id)
@@ -227,9 +230,17 @@ class ReviewServiceTest(TestCase):
 
 class ReviewAPITest(APITestCase):
     """评价API测试"""
-    
-    def setUp(self):
-        self.admin_user = User.objects.create_user(
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # URL 只解析一次，避免每个测试重复遍历 resolver
+        cls.SUBMIT_TASK_REVIEW_URL = reverse('reviews:review-submit-task-review')
+        cls.SUBMIT_MONTHLY_REVIEW_URL = reverse('reviews:review-submit-monthly-review')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_user(
             username='admin@test.com',
             email='admin@test.com',
             password='testpass123',
@@ -238,7 +249,7 @@ class ReviewAPITest(APITestCase):
             role='admin'
         )
         
-        self.member1 = User.objects.create_user(
+        cls.member1 = User.objects.create_user(
             username='member1@test.com',
             email='member1@test.com',
             password='testpass123',
@@ -247,7 +258,7 @@ class ReviewAPITest(APITestCase):
             role='member'
         )
         
-        self.member2 = User.objects.create_user(
+        cls.member2 = User.objects.create_user(
             username='member2@test.com',
             email='member2@test.com',
             password='testpass123',
@@ -256,21 +267,21 @@ class ReviewAPITest(APITestCase):
             role='member'
         )
         
-        self.task = Task.objects.create(
+        cls.task = Task.objects.create(
             title='测试任务',
             description='测试任务描述',
             difficulty_score=7,
             revenue_amount=Decimal('2000.00'),
             status=TaskStatus.COMPLETED,
-            owner=self.member1,
-            created_by=self.admin_user
+            owner=cls.member1,
+            created_by=cls.admin_user
         )
     
     def test_submit_task_review(self):
         """测试提交任务评价"""
         self.client.force_authenticate(user=self.member2)
         
-        url = reverse('reviews:review-submit-task-review')
+        url = self.SUBMIT_TASK_REVIEW_URL
         data = {
             'task': str(self.task.id),
             'rating': 8,
@@ -291,7 +302,7 @@ class ReviewAPITest(APITestCase):
         """测试任务评价验证"""
         self.client.force_authenticate(user=self.member2)
         
-        url = reverse('reviews:review-submit-task-review')
+        url = self.SUBMIT_TASK_REVIEW_URL
         
         # 测试评分范围验证
         data = {
@@ -309,7 +320,7 @@ class ReviewAPITest(APITestCase):
         """测试提交月度评价"""
         self.client.force_authenticate(user=self.member2)
         
-        url = reverse('reviews:review-submit-monthly-review')
+        url = self.SUBMIT_MONTHLY_REVIEW_URL
         data = {
             'reviewee': str(self.member1.id),
             'rating': 9,
@@ -332,23 +343,24 @@ class ReviewAPITest(APITestCase):
     
     def test_get_task_reviews(self):
         """测试获取任务评价列表"""
-        # 创建几个评价
-        Review.objects.create(
-            type=ReviewType.TASK,
-            task=self.task,
-            reviewer=self.admin_user,
-            rating=8,
-            comment='管理员评价'
-        )
-        
-        Review.objects.create(
-            type=ReviewType.TASK,
-            task=self.task,
-            reviewer=self.member2,
-            rating=7,
-            comment='成员评价',
-            is_anonymous=True
-        )
+        # 一次 bulk_create 建好评价
+        Review.objects.bulk_create([
+            Review(
+                type=ReviewType.TASK,
+                task=self.task,
+                reviewer=self.admin_user,
+                rating=8,
+                comment='管理员评价'
+            ),
+            Review(
+                type=ReviewType.TASK,
+                task=self.task,
+                reviewer=self.member2,
+                rating=7,
+                comment='成员评价',
+                is_anonymous=True
+            ),
+        ])
         
         self.client.force_authenticate(user=self.member1)
         
@@ -364,22 +376,23 @@ class ReviewAPITest(APITestCase):
     
     def test_get_task_review_summary(self):
         """测试获取任务评价汇总"""
-        # 创建评价
-        Review.objects.create(
-            type=ReviewType.TASK,
-            task=self.task,
-            reviewer=self.admin_user,
-            rating=8,
-            comment='管理员评价'
-        )
-        
-        Review.objects.create(
-            type=ReviewType.TASK,
-            task=self.task,
-            reviewer=self.member2,
-            rating=6,
-            comment='成员评价'
-        )
+        # 一次 bulk_create 建好评价
+        Review.objects.bulk_create([
+            Review(
+                type=ReviewType.TASK,
+                task=self.task,
+                reviewer=self.admin_user,
+                rating=8,
+                comment='管理员评价'
+            ),
+            Review(
+                type=ReviewType.TASK,
+                task=self.task,
+                reviewer=self.member2,
+                rating=6,
+                comment='成员评价'
+            ),
+        ])
         
         self.client.force_authenticate(user=self.admin_user)
         
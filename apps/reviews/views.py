@@ -5,16 +5,16 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, Prefetch, Q, Sum
 from django.db import transaction
 from decimal import Decimal, ROUND_HALF_UP
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from .models import Review, ReviewType
 from .serializers import (
-    ReviewSerializer, TaskReviewCreateSerializer, MonthlyReviewCreateSerializer,
-    TaskReviewSummarySerializer
+    ReviewSerializer, TaskReviewCreateSerializer, MonthlyReviewCreateSerializer
 )
+from .tasks import recompute_task_scores
 from apps.tasks.models import Task
 
 
@@ -29,24 +29,21 @@ class ReviewViewSet(viewsets.ModelViewSet):
         if getattr(self, 'swagger_fake_view', False):
             return Review.objects.none()
             
-        queryset = Review.objects.all()
-        
-        # 过滤参数
-        review_type = self.request.query_params.get('type')
-        task_id = self.request.query_params.get('task')
-        reviewee_id = self.request.query_params.get('reviewee')
-        month = self.request.query_params.get('month')
-        
-        if review_type:
-            queryset = queryset.filter(type=review_type)
-        if task_id:
-            queryset = queryset.filter(task_id=task_id)
-        if reviewee_id:
-            queryset = queryset.filter(reviewee_id=reviewee_id)
-        if month:
-            queryset = queryset.filter(month=month)
-        
-        return queryset.select_related('reviewer', 'reviewee', 'task').order_by('-created_at')
+        # 过滤参数拼成一个 dict，一次 filter 调用即可，避免反复克隆 QuerySet
+        params = self.request.query_params
+        filters = {}
+        if params.get('type'):
+            filters['type'] = params['type']
+        if params.get('task'):
+            filters['task_id'] = params['task']
+        if params.get('reviewee'):
+            filters['reviewee_id'] = params['reviewee']
+        if params.get('month'):
+            filters['month'] = params['month']
+
+        return Review.objects.filter(**filters).select_related(
+            'reviewer', 'reviewee', 'task'
+        ).order_by('-created_at')
     
     @swagger_auto_schema(
         method='post',
@@ -85,16 +82,19 @@ class ReviewViewSet(viewsets.ModelViewSet):
         """提交任务评价"""
         serializer = TaskReviewCreateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
+            # 事务只覆盖写入本身，响应序列化在提交后进行
             with transaction.atomic():
                 review = serializer.save()
-                
-                # 重新计算任务的评分调整系数
-                self._update_task_score_adjustment(review.task)
-                
-                return Response(
-                    ReviewSerializer(review, context={'request': request}).data,
-                    status=status.HTTP_201_CREATED
+
+                # 评分重算移出请求事务，评价写入提交后执行
+                transaction.on_commit(
+                    lambda: recompute_task_scores(review.task_id)
                 )
+
+            return Response(
+                ReviewSerializer(review, context={'request': request}).data,
+                status=status.HTTP_201_CREATED
+            )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     @swagger_auto_schema(
@@ -135,23 +135,29 @@ class ReviewViewSet(viewsets.ModelViewSet):
             404: "任务不存在"
         }
     )
-    @action(detail=False, methods=['get'], url_path='task-reviews/(?P<task_id>[^/.]+)')
+    @action(detail=False, methods=['get'], url_path='task-reviews/(?P<task_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})')
     def list_task_reviews(self, request, task_id=None):
         """获取任务的所有评价"""
+        # 任务和它的评价在同一次 ORM 取数中完成（only() 裁剪到序列化器实际用到的列）
+        review_queryset = Review.objects.filter(
+            type=ReviewType.TASK
+        ).select_related('reviewer').only(
+            'id', 'type', 'task', 'reviewee', 'rating', 'comment',
+            'is_anonymous', 'month', 'created_at',
+            'reviewer__id', 'reviewer__name', 'reviewer__email', 'reviewer__department'
+        ).order_by('-created_at')
+
         try:
-            task = Task.objects.get(id=task_id)
+            task = Task.objects.prefetch_related(
+                Prefetch('reviews', queryset=review_queryset, to_attr='task_reviews')
+            ).get(id=task_id)
         except Task.DoesNotExist:
             return Response(
                 {'error': '任务不存在'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        reviews = Review.objects.filter(
-            type=ReviewType.TASK,
-            task=task
-        ).select_related('reviewer').order_by('-created_at')
-        
-        serializer = ReviewSerializer(reviews, many=True, context={'request': request})
+
+        serializer = ReviewSerializer(task.task_reviews, many=True, context={'request': request})
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'], url_path='monthly-reviews')
@@ -167,11 +173,16 @@ class ReviewViewSet(viewsets.ModelViewSet):
         if reviewee_id:
             queryset = queryset.filter(reviewee_id=reviewee_id)
         
-        reviews = queryset.select_related('reviewer', 'reviewee').order_by('-created_at')
+        # 序列化器对 reviewee 只取外键ID，无需 JOIN；其余列按需裁剪
+        reviews = queryset.select_related('reviewer').only(
+            'id', 'type', 'task', 'reviewee', 'rating', 'comment',
+            'is_anonymous', 'month', 'created_at',
+            'reviewer__id', 'reviewer__name', 'reviewer__email', 'reviewer__department'
+        ).order_by('-created_at')
         serializer = ReviewSerializer(reviews, many=True, context={'request': request})
         return Response(serializer.data)
     
-    @action(detail=False, methods=['get'], url_path='task-summary/(?P<task_id>[^/.]+)')
+    @action(detail=False, methods=['get'], url_path='task-summary/(?P<task_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})')
     def get_task_review_summary(self, request, task_id=None):
         """获取任务评价汇总信息"""
         try:
@@ -184,10 +195,19 @@ class ReviewViewSet(viewsets.ModelViewSet):
         
         # 获取任务的所有评价
         reviews = Review.objects.filter(type=ReviewType.TASK, task=task)
-        
-        if not reviews.exists():
+
+        # 一条条件聚合查询同时得到数量与各角色评分总和，空集由 total_count 判断
+        stats = reviews.aggregate(
+            total_count=Count('id'),
+            admin_count=Count('id', filter=Q(reviewer__role='admin')),
+            member_count=Count('id', filter=Q(reviewer__role='member')),
+            admin_sum=Sum('rating', filter=Q(reviewer__role='admin')),
+            member_sum=Sum('rating', filter=Q(reviewer__role='member'))
+        )
+
+        if stats['total_count'] == 0:
             return Response({
-                'task_id': task.id,
+                'task_id': str(task.id),
                 'task_title': task.title,
                 'average_rating': 0,
                 'review_count': 0,
@@ -195,38 +215,40 @@ class ReviewViewSet(viewsets.ModelViewSet):
                 'member_review_count': 0,
                 'adjustment_factor': Decimal('0.700')
             })
-        
-        # 计算统计信息
-        stats = reviews.aggregate(
-            avg_rating=Avg('rating'),
-            total_count=Count('id')
-        )
-        
-        # 分别统计管理员和普通成员的评价
-        admin_reviews = reviews.filter(reviewer__role='admin')
-        member_reviews = reviews.filter(reviewer__role='member')
-        
-        admin_count = admin_reviews.count()
-        member_count = member_reviews.count()
-        
-        # 计算加权平均评分（管理员评分权重更高）
-        weighted_average = self._calculate_weighted_average_rating(task)
-        
-        # 计算调整系数
-        adjustment_factor = self._calculate_adjustment_factor(weighted_average)
-        
-        summary_data = {
-            'task_id': task.id,
+
+        admin_count = stats['admin_count']
+        member_count = stats['member_count']
+
+        if task.cached_adjustment_factor is not None:
+            # 评价提交时已把加权平均和调整系数写入任务缓存列，直接读取
+            weighted_average = task.cached_weighted_rating or Decimal('0.00')
+            adjustment_factor = task.cached_adjustment_factor
+        else:
+            admin_sum = stats['admin_sum'] or 0
+            member_sum = stats['member_sum'] or 0
+
+            # 计算加权平均评分（管理员评分权重为2，普通成员权重为1）
+            total_weight = admin_count * 2 + member_count * 1
+            if total_weight == 0:
+                weighted_average = Decimal('0.00')
+            else:
+                weighted_average = (
+                    Decimal(admin_sum * 2 + member_sum * 1) / total_weight
+                ).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+            # 计算调整系数
+            adjustment_factor = self._calculate_adjustment_factor(weighted_average)
+
+        # 纯字典数据不需要序列化器再走一遍字段转换，直接返回
+        return Response({
+            'task_id': str(task.id),
             'task_title': task.title,
             'average_rating': weighted_average,
             'review_count': stats['total_count'],
             'admin_review_count': admin_count,
             'member_review_count': member_count,
             'adjustment_factor': adjustment_factor
-        }
-        
-        serializer = TaskReviewSummarySerializer(summary_data)
-        return Response(serializer.data)
+        })
     
     @action(detail=False, methods=['get'], url_path='my-reviews')
     def get_my_reviews(self, request):
@@ -241,62 +263,24 @@ class ReviewViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='received-reviews')
     def get_received_reviews(self, request):
         """获取当前用户收到的评价"""
-        reviews = Review.objects.filter(
-            Q(reviewee=request.user) | Q(task__owner=request.user) | Q(task__collaborators=request.user)
-        ).distinct().select_related('reviewer', 'task').order_by('-created_at')
+        # 先取出用户参与的任务ID，避免外层查询 JOIN M2M 后再 distinct()
+        task_ids = list(Task.objects.filter(
+            Q(owner=request.user) | Q(collaborators=request.user)
+        ).values_list('id', flat=True))
+
+        # 两个条件各走各的索引，UNION 合并代替 OR 扫描
+        received = Review.objects.filter(
+            reviewee=request.user
+        ).select_related('reviewer', 'reviewee', 'task')
+        task_related = Review.objects.filter(
+            task_id__in=task_ids
+        ).select_related('reviewer', 'reviewee', 'task')
+
+        reviews = received.union(task_related).order_by('-created_at')
         
         serializer = ReviewSerializer(reviews, many=True, context={'request': request})
         return Response(serializer.data)
     
-    def _calculate_weighted_average_rating(self, task):
-        """计算任务的加权平均评分（管理员评分权重更高）"""
-        admin_reviews = Review.objects.filter(
-            type=ReviewType.TASK,
-            task=task,
-            reviewer__role='admin'
-        )
-        member_reviews = Review.objects.filter(
-            type=ReviewType.TASK,
-            task=task,
-            reviewer__role='member'
-        )
-        
-        admin_stats = admin_reviews.aggregate(
-            avg_rating=Avg('rating'),
-            count=Count('id')
-        )
-        member_stats = member_reviews.aggregate(
-            avg_rating=Avg('rating'),
-            count=Count('id')
-        )
-        
-        admin_avg = admin_stats['avg_rating'] or 0
-        member_avg = member_stats['avg_rating'] or 0
-        admin_count = admin_stats['count'] or 0
-        member_count = member_stats['count'] or 0
-        
-        if admin_count == 0 and member_count == 0:
-            return Decimal('0.00')
-        
-        # 管理员评分权重为2，普通成员权重为1
-        admin_weight = 2
-        member_weight = 1
-        
-        total_weighted_score = (
-            Decimal(str(admin_avg)) * admin_count * admin_weight +
-            Decimal(str(member_avg)) * member_count * member_weight
-        )
-        total_weight = admin_count * admin_weight + member_count * member_weight
-        
-        if total_weight == 0:
-            return Decimal('0.00')
-        
-        weighted_average = (total_weighted_score / total_weight).quantize(
-            Decimal('0.01'), rounding=ROUND_HALF_UP
-        )
-        
-        return weighted_average
-    
     def _calculate_adjustment_factor(self, weighted_average_rating):
         """计算任务评分调整系数"""
         if weighted_average_rating == 0:
@@ -307,40 +291,3 @@ class ReviewViewSet(viewsets.ModelViewSet):
         adjustment_factor = rating_factor + Decimal('0.7')
         
         return adjustment_factor.quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
-    
-    def _update_task_score_adjustment(self, task):
-        """更新任务的分值调整"""
-        # 重新计算加权平均评分
-        weighted_average = self._calculate_weighted_average_rating(task)
-        
-        # 计算新的调整系数
-        adjustment_factor = self._calculate_adjustment_factor(weighted_average)
-        
-        # 更新任务的分值分配（如果存在）
-        if hasattr(task, 'score_distribution'):
-            distribution = task.score_distribution
-            
-            # 重新计算调整后的分值
-            base_total_score = Decimal(str(task.difficulty_score)) * distribution.penalty_coefficient
-            adjusted_total_score = (base_total_score * adjustment_factor).quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            )
-            
-            # 更新分值分配
-            distribution.total_score = adjusted_total_score
-            distribution.save()
-            
-            # 重新分配个人分值
-            self._redistribute_individual_scores(distribution, adjusted_total_score)
-    
-    def _redistribute_individual_scores(self, distribution, new_total_score):
-        """重新分配个人分值"""
-        allocations = distribution.allocations.all()
-        
-        for allocation in allocations:
-            # 按比例重新计算个人分值
-            new_score = (new_total_score * allocation.percentage / Decimal('100')).quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            )
-            allocation.adjusted_score = new_score
-            allocation.save()
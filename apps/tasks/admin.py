@@ -1,9 +1,54 @@
+import hashlib
+
 from django.contrib import admin
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.utils.html import format_html
-from django.db.models import Count, Avg
+from django.db.models import Count, Avg, Q
+from django.db.models.functions import Now, Substr
+from django.core.paginator import Paginator
 from django.urls import reverse
+from django.utils.functional import cached_property
 from django.utils.safestring import mark_safe
 from .models import Task, ScoreDistribution, ScoreAllocation, TaskStatus
+from .tasks import recalc_task_scores
+
+# 列表页展示用的颜色/图标映射，模块级常量避免每行渲染都重建字典
+_STATUS_COLORS = {
+    TaskStatus.TODO: '#6C757D',        # 灰色
+    TaskStatus.IN_PROGRESS: '#007BFF', # 蓝色
+    TaskStatus.COMPLETED: '#28A745',   # 绿色
+    TaskStatus.POSTPONED: '#DC3545'    # 红色
+}
+_STATUS_ICONS = {
+    TaskStatus.TODO: '⏳',
+    TaskStatus.IN_PROGRESS: '🔄',
+    TaskStatus.COMPLETED: '✅',
+    TaskStatus.POSTPONED: '⏸️'
+}
+_DEPT_COLORS = {
+    'hardware': '#FF6B6B',
+    'software': '#4ECDC4',
+    'marketing': '#45B7D1'
+}
+
+
+class CachedCountPaginator(Paginator):
+    """列表页分页器：COUNT(*) 结果做短时缓存
+
+    大表上每翻一页都全表 COUNT 的开销远超取数本身；
+    缓存键按查询SQL区分，不同筛选条件互不串数。
+    """
+
+    @cached_property
+    def count(self):
+        try:
+            sql = str(self.object_list.query)
+        except AttributeError:
+            return len(self.object_list)
+        cache_key = 'task_changelist_count_%s' % hashlib.md5(sql.encode()).hexdigest()
+        return cache.get_or_set(cache_key, self.object_list.count, 30)
 
 
 @admin.register(Task)
@@ -35,22 +80,26 @@ class TaskAdmin(admin.ModelAdmin):
         'completed_at'
     )
     
-    # 搜索字段
-    search_fields = ('title', 'description', 'owner__name', 'owner__email')
+    # 搜索字段（description 是大文本列，全列 ILIKE 扫描代价太高，不参与搜索）
+    search_fields = ('title', 'owner__name', 'owner__email')
     
     # 排序
     ordering = ('-created_at',)
     
     # 每页显示数量
     list_per_page = 25
+
+    # 分页 COUNT 走短时缓存，且筛选时不再额外统计全表总数
+    paginator = CachedCountPaginator
+    show_full_result_count = False
     
     # 可编辑字段（在列表页面直接编辑）
     list_editable = ('status',)
+
+    # 列表页关联对象一次 JOIN 取回
+    list_select_related = ('owner', 'created_by')
     
-    # 水平过滤器
-    filter_horizontal = ('collaborators',)
-    
-    # 自动完成字段
+    # 自动完成字段（异步分页搜索，避免 filter_horizontal 一次性加载全部用户）
     autocomplete_fields = ['owner', 'collaborators', 'created_by']
     
     # 详情页面字段分组
@@ -84,20 +133,8 @@ class TaskAdmin(admin.ModelAdmin):
     # 自定义显示方法
     def get_status_display_colored(self, obj):
         """显示带颜色的状态"""
-        colors = {
-            TaskStatus.TODO: '#6C757D',        # 灰色
-            TaskStatus.IN_PROGRESS: '#007BFF', # 蓝色
-            TaskStatus.COMPLETED: '#28A745',   # 绿色
-            TaskStatus.POSTPONED: '#DC3545'    # 红色
-        }
-        icons = {
-            TaskStatus.TODO: '⏳',
-            TaskStatus.IN_PROGRESS: '🔄',
-            TaskStatus.COMPLETED: '✅',
-            TaskStatus.POSTPONED: '⏸️'
-        }
-        color = colors.get(obj.status, '#6C757D')
-        icon = icons.get(obj.status, '❓')
+        color = _STATUS_COLORS.get(obj.status, '#6C757D')
+        icon = _STATUS_ICONS.get(obj.status, '❓')
         return format_html(
             '<span style="color: {}; font-weight: bold;">{} {}</span>',
             color,
@@ -138,12 +175,7 @@ class TaskAdmin(admin.ModelAdmin):
     
     def get_owner_info(self, obj):
         """显示负责人信息"""
-        colors = {
-            'hardware': '#FF6B6B',
-            'software': '#4ECDC4',
-            'marketing': '#45B7D1'
-        }
-        color = colors.get(obj.owner.department, '#6C757D')
+        color = _DEPT_COLORS.get(obj.owner.department, '#6C757D')
         return format_html(
             '<strong>{}</strong><br><small style="color: {};">{}</small>',
             obj.owner.name,
@@ -155,7 +187,7 @@ class TaskAdmin(admin.ModelAdmin):
     
     def get_collaborators_count(self, obj):
         """显示协作者数量"""
-        count = obj.collaborators.count()
+        count = obj._collab_count
         if count > 0:
             return format_html(
                 '<span style="color: #007BFF; font-weight: bold;">{} 人</span>',
@@ -181,9 +213,11 @@ class TaskAdmin(admin.ModelAdmin):
                 duration.days
             )
         elif obj.status == TaskStatus.POSTPONED:
+            # _reason_short 由 get_queryset 注解提供（数据库侧截断到21字符）
+            reason = obj._reason_short or ''
             return format_html(
                 '<small style="color: #DC3545;">已推迟<br>原因: {}</small>',
-                obj.postpone_reason[:20] + '...' if len(obj.postpone_reason) > 20 else obj.postpone_reason
+                reason[:20] + '...' if len(reason) > 20 else reason
             )
         else:
             return format_html('<small style="color: #6C757D;">待开始</small>')
@@ -194,88 +228,110 @@ class TaskAdmin(admin.ModelAdmin):
     
     def mark_as_completed(self, request, queryset):
         """批量标记为已完成"""
-        from django.utils import timezone
+        # 时间戳用数据库侧 NOW()，与 UPDATE 原子一致
         updated = queryset.filter(status__in=[TaskStatus.TODO, TaskStatus.IN_PROGRESS]).update(
             status=TaskStatus.COMPLETED,
-            completed_at=timezone.now()
+            completed_at=Now()
         )
         self.message_user(request, f'成功将 {updated} 个任务标记为已完成。')
     mark_as_completed.short_description = "标记选中任务为已完成"
-    
+
     def mark_as_in_progress(self, request, queryset):
         """批量标记为进行中"""
-        from django.utils import timezone
         updated = queryset.filter(status=TaskStatus.TODO).update(
             status=TaskStatus.IN_PROGRESS,
-            started_at=timezone.now()
+            started_at=Now()
         )
         self.message_user(request, f'成功将 {updated} 个任务标记为进行中。')
     mark_as_in_progress.short_description = "标记选中任务为进行中"
-    
+
     def mark_as_postponed(self, request, queryset):
         """批量标记为推迟"""
-        from django.utils import timezone
         updated = queryset.filter(status__in=[TaskStatus.TODO, TaskStatus.IN_PROGRESS]).update(
             status=TaskStatus.POSTPONED,
-            postponed_at=timezone.now(),
+            postponed_at=Now(),
             postpone_reason='管理员批量操作'
         )
         self.message_user(request, f'成功将 {updated} 个任务标记为推迟。', level='warning')
     mark_as_postponed.short_description = "标记选中任务为推迟"
     
     def calculate_scores(self, request, queryset):
-        """批量计算分值分配"""
-        completed_tasks = queryset.filter(status=TaskStatus.COMPLETED)
-        calculated_count = 0
-        
-        for task in completed_tasks:
-            try:
-                ScoreDistribution.calculate_and_create(task)
-                calculated_count += 1
-            except Exception as e:
-                self.message_user(
-                    request,
-                    f'任务 "{task.title}" 分值计算失败: {str(e)}',
-                    level='error'
-                )
-        
-        if calculated_count > 0:
-            self.message_user(
-                request,
-                f'成功为 {calculated_count} 个已完成任务计算分值分配。',
-                level='success'
-            )
+        """批量计算分值分配（重算在请求事务提交后执行）"""
+        task_ids = list(
+            queryset.filter(status=TaskStatus.COMPLETED).values_list('id', flat=True)
+        )
+
+        if not task_ids:
+            return
+
+        # 耗时的重算不占用管理后台请求事务，立即反馈排队结果
+        transaction.on_commit(lambda: recalc_task_scores(task_ids))
+
+        self.message_user(
+            request,
+            f'已安排 {len(task_ids)} 个已完成任务的分值计算。',
+            level='success'
+        )
     calculate_scores.short_description = "为选中的已完成任务计算分值分配"
     
     def get_queryset(self, request):
-        """优化查询，预加载相关对象"""
+        """优化查询：协作者数量用注解一次算好，大文本列不取全量"""
+        # 推迟原因只展示前20个字符，截断放到数据库侧完成；
+        # 其余列按 list_display 实际渲染的字段用 only() 白名单裁剪
         return super().get_queryset(request).select_related(
             'owner', 'created_by'
-        ).prefetch_related('collaborators')
+        ).annotate(
+            _collab_count=Count('collaborators'),
+            _reason_short=Substr('postpone_reason', 1, 21)
+        ).only(
+            'id', 'title', 'status', 'difficulty_score', 'revenue_amount',
+            'created_at', 'started_at', 'completed_at', 'postponed_at',
+            'owner__name', 'owner__department', 'created_by__id'
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        """标题搜索在 PostgreSQL 上改走 trigram 相似度，命中 GIN 索引"""
+        if search_term and connection.vendor == 'postgresql':
+            queryset = queryset.annotate(
+                _title_sim=TrigramSimilarity('title', search_term)
+            ).filter(
+                Q(_title_sim__gt=0.3) |
+                Q(owner__name__icontains=search_term) |
+                Q(owner__email__icontains=search_term)
+            )
+            return queryset, False
+        return super().get_search_results(request, queryset, search_term)
     
     def changelist_view(self, request, extra_context=None):
         """添加统计信息到列表页面"""
         extra_context = extra_context or {}
-        
-        # 计算统计信息
-        total_tasks = Task.objects.count()
-        completed_tasks = Task.objects.filter(status=TaskStatus.COMPLETED).count()
-        in_progress_tasks = Task.objects.filter(status=TaskStatus.IN_PROGRESS).count()
-        postponed_tasks = Task.objects.filter(status=TaskStatus.POSTPONED).count()
-        
-        avg_difficulty = Task.objects.aggregate(avg=Avg('difficulty_score'))['avg']
-        avg_difficulty = round(avg_difficulty, 2) if avg_difficulty else 0
-        
-        extra_context.update({
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'in_progress_tasks': in_progress_tasks,
-            'postponed_tasks': postponed_tasks,
-            'avg_difficulty': avg_difficulty,
-        })
-        
+
+        # 统计信息合并为一条条件聚合查询，并做短时缓存
+        extra_context.update(
+            cache.get_or_set('task_admin_stats_v1', self._collect_stats, 60)
+        )
+
         return super().changelist_view(request, extra_context)
 
+    @staticmethod
+    def _collect_stats():
+        """一次聚合查询计算列表页统计信息"""
+        stats = Task.objects.aggregate(
+            total=Count('pk'),
+            completed=Count('pk', filter=Q(status=TaskStatus.COMPLETED)),
+            in_progress=Count('pk', filter=Q(status=TaskStatus.IN_PROGRESS)),
+            postponed=Count('pk', filter=Q(status=TaskStatus.POSTPONED)),
+            avg_difficulty=Avg('difficulty_score')
+        )
+        avg_difficulty = stats['avg_difficulty']
+        return {
+            'total_tasks': stats['total'],
+            'completed_tasks': stats['completed'],
+            'in_progress_tasks': stats['in_progress'],
+            'postponed_tasks': stats['postponed'],
+            'avg_difficulty': round(avg_difficulty, 2) if avg_difficulty else 0,
+        }
+
 
 class ScoreAllocationInline(admin.TabularInline):
     model = ScoreAllocation
@@ -383,15 +439,13 @@ class ScoreAllocationAdmin(admin.ModelAdmin):
     search_fields = ('user__name', 'distribution__task__title')
     ordering = ('-distribution__calculated_at', 'user__name')
     readonly_fields = ('distribution', 'user', 'base_score', 'adjusted_score', 'percentage')
+
+    # 列表页关联对象一次 JOIN 取回
+    list_select_related = ('user', 'distribution', 'distribution__task')
     
     def get_user_info(self, obj):
         """显示用户信息"""
-        colors = {
-            'hardware': '#FF6B6B',
-            'software': '#4ECDC4',
-            'marketing': '#45B7D1'
-        }
-        color = colors.get(obj.user.department, '#6C757D')
+        color = _DEPT_COLORS.get(obj.user.department, '#6C757D')
         return format_html(
             '<strong>{}</strong><br><small style="color: {};">{}</small>',
             obj.user.name,
@@ -424,7 +478,12 @@ class ScoreAllocationAdmin(admin.ModelAdmin):
         return False  # 不允许修改，保证数据完整性
     
     def get_queryset(self, request):
-        """优化查询"""
+        """优化查询：JOIN 一次取回，列按列表页实际渲染的字段裁剪"""
         return super().get_queryset(request).select_related(
             'user', 'distribution', 'distribution__task'
+        ).only(
+            'base_score', 'adjusted_score', 'percentage',
+            'user__name', 'user__department',
+            'distribution__calculated_at',
+            'distribution__task__title', 'distribution__task__difficulty_score'
         )
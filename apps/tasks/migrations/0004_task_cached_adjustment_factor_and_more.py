@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-08-26 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_scoredistribution_scoreallocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='cached_adjustment_factor',
+            field=models.DecimalField(blank=True, decimal_places=3, max_digits=4, null=True, verbose_name='缓存调整系数'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='cached_weighted_rating',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True, verbose_name='缓存加权平均评分'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-08-26 09:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_cached_adjustment_factor_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scoreallocation',
+            index=models.Index(fields=['user', 'distribution'], name='score_alloc_user_id_ec68df_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoredistribution',
+            index=models.Index(fields=['-calculated_at'], name='score_distr_calcula_260804_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'owner'], name='tasks_status_9640ee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', '-created_at'], name='tasks_owner_i_7197c8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'difficulty_score'], name='tasks_status_2dc351_idx'),
+        ),
+    ]
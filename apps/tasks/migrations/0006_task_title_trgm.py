@@ -0,0 +1,44 @@
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+def create_title_trgm_index(apps, schema_editor):
+    # pg_trgm 与 GIN 索引仅在 PostgreSQL 上创建，其他后端（如本地 SQLite）跳过
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS task_title_trgm '
+        'ON tasks USING gin (title gin_trgm_ops)'
+    )
+
+
+def drop_title_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS task_title_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_scoreallocation_score_alloc_user_id_ec68df_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='task',
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        fields=['title'],
+                        name='task_title_trgm',
+                        opclasses=['gin_trgm_ops'],
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_title_trgm_index, drop_title_trgm_index),
+            ],
+        ),
+    ]
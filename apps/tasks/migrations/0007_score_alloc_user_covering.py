@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def create_covering_index(apps, schema_editor):
+    # INCLUDE 覆盖索引仅 PostgreSQL 支持，其他后端（如本地 SQLite）跳过
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS score_alloc_user_covering '
+        'ON score_allocations (user_id, distribution_id) INCLUDE (adjusted_score)'
+    )
+
+
+def drop_covering_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS score_alloc_user_covering')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_title_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_covering_index, drop_covering_index),
+    ]
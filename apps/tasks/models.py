@@ -1,6 +1,7 @@
 """
 Task models for OKR Performance System
 """
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -61,6 +62,20 @@ class Task(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name='完成时间')
     postponed_at = models.DateTimeField(null=True, blank=True, verbose_name='推迟时间')
     postpone_reason = models.TextField(blank=True, verbose_name='推迟原因')
+    cached_weighted_rating = models.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='缓存加权平均评分'
+    )
+    cached_adjustment_factor = models.DecimalField(
+        max_digits=4,
+        decimal_places=3,
+        null=True,
+        blank=True,
+        verbose_name='缓存调整系数'
+    )
 
     class Meta:
         db_table = 'tasks'
@@ -70,6 +85,12 @@ class Task(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['owner']),
             models.Index(fields=['completed_at']),
+            # 管理后台常用筛选组合
+            models.Index(fields=['status', 'owner']),
+            models.Index(fields=['owner', '-created_at']),
+            models.Index(fields=['status', 'difficulty_score']),
+            # 标题模糊搜索走 trigram 索引（仅 PostgreSQL）
+            GinIndex(name='task_title_trgm', fields=['title'], opclasses=['gin_trgm_ops']),
         ]
 
     def __str__(self):
@@ -120,6 +141,9 @@ class ScoreDistribution(models.Model):
         db_table = 'score_distributions'
         verbose_name = '分值分配'
         verbose_name_plural = '分值分配'
+        indexes = [
+            models.Index(fields=['-calculated_at']),
+        ]
 
     def __str__(self):
         return f"{self.task.title} - 总分值: {self.total_score}"
@@ -130,61 +154,77 @@ class ScoreDistribution(models.Model):
         if not task.is_completed():
             raise ValueError("只有已完成的任务才能计算分值分配")
         
-        # 删除已存在的分值分配（如果有）
-        cls.objects.filter(task=task).delete()
-        
-        # 计算惩罚系数（如果任务曾经被推迟过）
-        penalty_coefficient = Decimal('0.800') if task.was_ever_postponed() else Decimal('1.000')
-        
-        # 计算总分值（应用惩罚系数）
-        base_score = Decimal(str(task.difficulty_score))
-        total_score = (base_score * penalty_coefficient).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        
-        # 创建分值分配记录
-        distribution = cls.objects.create(
+        # 分值全程用整数“分”（百分位）运算，HALF_UP 舍入以整数除法实现，
+        # 写入 ORM 行时才转换成 Decimal——重算热路径上省掉反复的 quantize
+        penalty_millis = 800 if task.was_ever_postponed() else 1000
+        penalty_coefficient = Decimal(penalty_millis).scaleb(-3)
+
+        # 总分值 = 难度分 × 惩罚系数（难度为整数，结果恰为整数分）
+        total_cents = task.difficulty_score * penalty_millis // 10
+        total_score = Decimal(total_cents).scaleb(-2)
+
+        # 创建或更新分值分配记录（原地 upsert，避免级联 DELETE + 重建索引）
+        distribution, _ = cls.objects.update_or_create(
             task=task,
-            total_score=total_score,
-            penalty_coefficient=penalty_coefficient
+            defaults={
+                'total_score': total_score,
+                'penalty_coefficient': penalty_coefficient
+            }
         )
         
-        # 计算个人分值分配
-        participants = task.get_all_participants()
-        collaborators = list(task.collaborators.all())
-        
-        if not collaborators:
+        # 计算个人分值分配：直接从 M2M 中间表取协作者ID，
+        # 不实例化 User 对象，分配记录一条批量语句写入
+        collaborator_ids = list(task.collaborators.values_list('id', flat=True))
+
+        if not collaborator_ids:
             # 单人任务：负责人获得100%分值
-            ScoreAllocation.objects.create(
+            allocations = [ScoreAllocation(
                 distribution=distribution,
-                user=task.owner,
+                user_id=task.owner_id,
                 base_score=total_score,
                 adjusted_score=total_score,
                 percentage=Decimal('100.00')
-            )
+            )]
         else:
             # 多人任务：负责人50%，协作者平分50%
-            owner_score = (total_score * Decimal('0.50')).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            collaborator_total = total_score - owner_score
-            collaborator_score = (collaborator_total / len(collaborators)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            
-            # 创建负责人分值分配
-            ScoreAllocation.objects.create(
+            # (2a + b) // (2b) 即 a/b 的 HALF_UP 取整
+            count = len(collaborator_ids)
+            owner_cents = (total_cents + 1) // 2
+            collaborator_cents = (2 * (total_cents - owner_cents) + count) // (2 * count)
+            percentage_cents = (10000 + count) // (2 * count)
+
+            owner_score = Decimal(owner_cents).scaleb(-2)
+            collaborator_score = Decimal(collaborator_cents).scaleb(-2)
+            collaborator_percentage = Decimal(percentage_cents).scaleb(-2)
+
+            allocations = [ScoreAllocation(
                 distribution=distribution,
-                user=task.owner,
+                user_id=task.owner_id,
                 base_score=owner_score,
                 adjusted_score=owner_score,
                 percentage=Decimal('50.00')
-            )
-            
-            # 创建协作者分值分配
-            collaborator_percentage = (Decimal('50.00') / len(collaborators)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            for collaborator in collaborators:
-                ScoreAllocation.objects.create(
+            )]
+            allocations.extend(
+                ScoreAllocation(
                     distribution=distribution,
-                    user=collaborator,
+                    user_id=collaborator_id,
                     base_score=collaborator_score,
                     adjusted_score=collaborator_score,
                     percentage=collaborator_percentage
                 )
+                for collaborator_id in collaborator_ids
+            )
+
+        # 明细同样走 upsert：已有参与者原地更新，不再参与的行才删除
+        distribution.allocations.exclude(
+            user_id__in=[allocation.user_id for allocation in allocations]
+        ).delete()
+        ScoreAllocation.objects.bulk_create(
+            allocations,
+            update_conflicts=True,
+            unique_fields=['distribution', 'user'],
+            update_fields=['base_score', 'adjusted_score', 'percentage']
+        )
         
         # 更新用户累积分值
         distribution.update_cumulative_scores()
@@ -193,21 +233,18 @@ class ScoreDistribution(models.Model):
     
     def update_cumulative_scores(self):
         """更新所有参与者的累积分值"""
-        from apps.users.models import User
-        
-        for allocation in self.allocations.all():
-            user = allocation.user
-            # 这里可以添加累积分值字段到User模型，或者创建单独的累积分值模型
-            # 暂时先计算当前月份的累积分值
-            current_month_allocations = ScoreAllocation.objects.filter(
-                user=user,
-                distribution__calculated_at__year=timezone.now().year,
-                distribution__calculated_at__month=timezone.now().month
-            )
-            cumulative_score = sum(alloc.adjusted_score for alloc in current_month_allocations)
-            
-            # 这里可以保存到用户的累积分值字段或单独的模型中
-            # 目前先在内存中计算，后续可以扩展
+        # 一条 GROUP BY 聚合查询算出所有参与者当月的累积分值，
+        # 代替逐人查询 + Python 求和
+        now = timezone.now()
+        monthly_totals = ScoreAllocation.objects.filter(
+            user__in=self.allocations.values('user'),
+            distribution__calculated_at__year=now.year,
+            distribution__calculated_at__month=now.month
+        ).values('user').annotate(total=models.Sum('adjusted_score'))
+
+        # 这里可以保存到用户的累积分值字段或单独的模型中
+        # 目前先返回计算结果，后续可以扩展
+        return {row['user']: row['total'] for row in monthly_totals}
 
 
 class ScoreAllocation(models.Model):
@@ -245,6 +282,9 @@ class ScoreAllocation(models.Model):
         verbose_name = '分值分配明细'
         verbose_name_plural = '分值分配明细'
         unique_together = [['distribution', 'user']]
+        indexes = [
+            models.Index(fields=['user', 'distribution']),
+        ]
 
     def __str__(self):
         return f"{self.user.name} - {self.distribution.task.title}: {self.adjusted_score}分"
@@ -1,10 +1,15 @@
 """
 Serializers for Task model
 """
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Task, TaskStatus, ScoreDistribution, ScoreAllocation
+from apps.users.models import User
 from apps.users.serializers import UserSerializer
 
+# 状态选项在导入时绑定一次（TextChoices.choices 每次访问都重建元组列表）
+_TASK_STATUS_CHOICES = tuple(TaskStatus.choices)
+
 
 class TaskSerializer(serializers.ModelSerializer):
     """任务序列化器"""
@@ -23,6 +28,11 @@ class TaskSerializer(serializers.ModelSerializer):
             'id', 'created_at', 'started_at', 'completed_at', 'postponed_at'
         ]
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """预加载嵌套 UserSerializer 所需的关联对象，消除逐行查询"""
+        return queryset.select_related('owner', 'created_by').prefetch_related('collaborators')
+
 
 class TaskCreateSerializer(serializers.ModelSerializer):
     """任务创建序列化器"""
@@ -55,47 +65,40 @@ class TaskCreateSerializer(serializers.ModelSerializer):
     
     def validate_owner_id(self, value):
         """验证负责人存在"""
-        from apps.users.models import User
-        try:
-            User.objects.get(id=value)
-        except User.DoesNotExist:
+        if not User.objects.filter(id=value).exists():
             raise serializers.ValidationError('指定的负责人不存在')
         return value
     
     def validate_collaborator_ids(self, value):
-        """验证协作者存在"""
+        """验证协作者存在（常规路径只比对 COUNT，不取回任何行）"""
         if not value:
             return value
-        
-        from apps.users.models import User
-        existing_ids = set(User.objects.filter(id__in=value).values_list('id', flat=True))
+
         provided_ids = set(value)
-        
-        if existing_ids != provided_ids:
+        if User.objects.filter(id__in=provided_ids).count() != len(provided_ids):
+            # 只有校验失败时才取回ID，用于拼装错误信息
+            existing_ids = set(User.objects.filter(id__in=provided_ids).values_list('id', flat=True))
             missing_ids = provided_ids - existing_ids
             raise serializers.ValidationError(f'以下协作者不存在: {list(missing_ids)}')
-        
+
         return value
-    
+
     def create(self, validated_data):
         """创建任务"""
         owner_id = validated_data.pop('owner_id')
         collaborator_ids = validated_data.pop('collaborator_ids', [])
-        
-        # Set owner and created_by
-        from apps.users.models import User
-        owner = User.objects.get(id=owner_id)
-        validated_data['owner'] = owner
+
+        # Set owner and created_by（owner 已在校验阶段确认存在，直接用外键ID，免一次 SELECT）
+        validated_data['owner_id'] = owner_id
         validated_data['created_by'] = self.context['request'].user
-        
+
         # Create task
         task = Task.objects.create(**validated_data)
-        
-        # Add collaborators
+
+        # Add collaborators（set() 直接接受主键，无需 User 实例）
         if collaborator_ids:
-            collaborators = User.objects.filter(id__in=collaborator_ids)
-            task.collaborators.set(collaborators)
-        
+            task.collaborators.set(collaborator_ids)
+
         return task
 
 
@@ -128,44 +131,41 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
         return value
     
     def validate_collaborator_ids(self, value):
-        """验证协作者存在"""
+        """验证协作者存在（常规路径只比对 COUNT，不取回任何行）"""
         if not value:
             return value
-        
-        from apps.users.models import User
-        existing_ids = set(User.objects.filter(id__in=value).values_list('id', flat=True))
+
         provided_ids = set(value)
-        
-        if existing_ids != provided_ids:
+        if User.objects.filter(id__in=provided_ids).count() != len(provided_ids):
+            # 只有校验失败时才取回ID，用于拼装错误信息
+            existing_ids = set(User.objects.filter(id__in=provided_ids).values_list('id', flat=True))
             missing_ids = provided_ids - existing_ids
             raise serializers.ValidationError(f'以下协作者不存在: {list(missing_ids)}')
-        
+
         return value
-    
+
     def update(self, instance, validated_data):
         """更新任务"""
         collaborator_ids = validated_data.pop('collaborator_ids', None)
-        
+
         # Update basic fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
-        
-        # Update collaborators if provided
+
+        # Update collaborators if provided（set() 直接接受主键，无需 User 实例）
         if collaborator_ids is not None:
             if collaborator_ids:
-                from apps.users.models import User
-                collaborators = User.objects.filter(id__in=collaborator_ids)
-                instance.collaborators.set(collaborators)
+                instance.collaborators.set(collaborator_ids)
             else:
                 instance.collaborators.clear()
-        
+
         return instance
 
 
 class TaskStatusUpdateSerializer(serializers.Serializer):
     """任务状态更新序列化器"""
-    status = serializers.ChoiceField(choices=TaskStatus.choices)
+    status = serializers.ChoiceField(choices=_TASK_STATUS_CHOICES)
     postpone_reason = serializers.CharField(required=False, allow_blank=True)
     
     def validate(self, data):
@@ -185,31 +185,40 @@ class TaskStatusUpdateSerializer(serializers.Serializer):
 class TaskListSerializer(serializers.ModelSerializer):
     """任务列表序列化器（简化版）"""
     owner_name = serializers.CharField(source='owner.name', read_only=True)
-    collaborator_count = serializers.SerializerMethodField()
-    
+    # 由视图的 queryset 注解提供，避免每行一条 COUNT 查询
+    collaborator_count = serializers.IntegerField(read_only=True)
+    collaborator_names = serializers.SerializerMethodField()
+
     class Meta:
         model = Task
         fields = [
             'id', 'title', 'difficulty_score', 'revenue_amount', 'status',
-            'owner_name', 'collaborator_count', 'created_at'
+            'owner_name', 'collaborator_count', 'collaborator_names', 'created_at'
         ]
-    
-    def get_collaborator_count(self, obj):
-        """获取协作者数量"""
-        return obj.collaborators.count()
+
+    def get_collaborator_names(self, obj):
+        """协作者姓名列表（读取视图预取的缓存，不触发额外查询）"""
+        return [user.name for user in obj.collaborators.all()]
 
 
 class ScoreAllocationSerializer(serializers.ModelSerializer):
     """分值分配明细序列化器"""
     user = UserSerializer(read_only=True)
-    task_title = serializers.CharField(source='distribution.task.title', read_only=True)
-    
+    task_title = serializers.SerializerMethodField()
+
     class Meta:
         model = ScoreAllocation
         fields = [
             'id', 'user', 'task_title', 'base_score', 'adjusted_score', 'percentage'
         ]
 
+    def get_task_title(self, obj):
+        """任务标题：父级序列化器注入 context 时直接复用，免去逐行关联取值"""
+        title = self.context.get('task_title')
+        if title is not None:
+            return title
+        return obj.distribution.task.title
+
 
 class ScoreDistributionSerializer(serializers.ModelSerializer):
     """分值分配序列化器"""
@@ -219,24 +228,43 @@ class ScoreDistributionSerializer(serializers.ModelSerializer):
     class Meta:
         model = ScoreDistribution
         fields = [
-            'id', 'task', 'total_score', 'penalty_coefficient', 
+            'id', 'task', 'total_score', 'penalty_coefficient',
             'calculated_at', 'allocations'
         ]
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """预加载嵌套的任务、参与者和分配明细，消除逐行查询"""
+        return queryset.select_related(
+            'task__owner', 'task__created_by'
+        ).prefetch_related(
+            'task__collaborators',
+            # 明细和用户一条 JOIN 查询取回，比 'allocations__user' 少一次往返
+            Prefetch(
+                'allocations',
+                queryset=ScoreAllocation.objects.select_related('user')
+            )
+        )
+
+    def to_representation(self, instance):
+        """任务标题在父级取一次注入 context，明细行不再各自穿越 distribution→task"""
+        self.context['task_title'] = instance.task.title
+        try:
+            return super().to_representation(instance)
+        finally:
+            self.context.pop('task_title', None)
+
 
 class ScoreDistributionSummarySerializer(serializers.ModelSerializer):
     """分值分配摘要序列化器（不包含详细分配信息）"""
     task_title = serializers.CharField(source='task.title', read_only=True)
     task_id = serializers.UUIDField(source='task.id', read_only=True)
-    allocation_count = serializers.SerializerMethodField()
-    
+    # 由视图的 queryset 注解提供，避免每行一条 COUNT 查询
+    allocation_count = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = ScoreDistribution
         fields = [
-            'id', 'task_id', 'task_title', 'total_score', 
+            'id', 'task_id', 'task_title', 'total_score',
             'penalty_coefficient', 'calculated_at', 'allocation_count'
-        ]
-    
-    def get_allocation_count(self, obj):
-        """获取分配明细数量"""
-        return obj.allocations.count()
\ No newline at end of file
+        ]
\ No newline at end of file
@@ -2,10 +2,27 @@
 Task-related business logic services
 """
 from decimal import Decimal, ROUND_HALF_UP
+from django.core.cache import cache
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count, Sum
 from .models import Task, ScoreDistribution, ScoreAllocation
 
+# 难度分值的 Decimal 形式预先构造好，热路径免去 str() 分配和字符串解析
+_DIFFICULTY_DECIMALS = {i: Decimal(i) for i in range(0, 21)}
+_HUNDRED = Decimal('100')
+
+# 分值分配读取缓存的有效期（秒）
+SCORE_DISTRIBUTION_CACHE_TTL = 300
+
+
+def score_distribution_cache_key(task_id):
+    """任务分值分配序列化结果的缓存键
+
+    Task 没有 updated_at 列可做键轮换，重算写入时主动删除该键。
+    """
+    return f'score_dist:{task_id}'
+
 
 class TaskScoreService:
     """任务分值计算服务"""
@@ -19,101 +36,140 @@ class TaskScoreService:
     COLLABORATOR_PERCENTAGE = Decimal('50.00')
     SINGLE_OWNER_PERCENTAGE = Decimal('100.00')
 
+    # 常见团队规模的协作者比例在类加载时量化好，热路径免去 Decimal 除法和 quantize
+    # （注意：类体中的字典推导式看不到类属性，比例用字面量）
+    _COLLAB_PERCENTAGE_CACHE = {
+        n: (Decimal('50.00') / n).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        for n in range(1, 33)
+    }
+
     @classmethod
-    @transaction.atomic
     def calculate_task_score_distribution(cls, task):
         """
         计算任务分值分配
-        
+
+        前置检查和分值计算都在事务外完成，事务只覆盖写入本身，
+        缩短并发重算时的行锁持有时间。
+
         Args:
             task: Task实例
-            
+
         Returns:
             ScoreDistribution实例
-            
+
         Raises:
             ValueError: 如果任务未完成
         """
         if not task.is_completed():
             raise ValueError("只有已完成的任务才能计算分值分配")
-        
-        # 删除已存在的分值分配（如果有）
-        ScoreDistribution.objects.filter(task=task).delete()
-        
+
         # 计算惩罚系数（如果任务曾经被推迟过）
         penalty_coefficient = (
-            cls.POSTPONED_PENALTY_COEFFICIENT 
-            if task.was_ever_postponed() 
+            cls.POSTPONED_PENALTY_COEFFICIENT
+            if task.was_ever_postponed()
             else cls.NORMAL_COEFFICIENT
         )
-        
+
         # 计算总分值（应用惩罚系数）
-        base_score = Decimal(str(task.difficulty_score))
+        base_score = _DIFFICULTY_DECIMALS.get(task.difficulty_score) or Decimal(task.difficulty_score)
         total_score = cls._round_to_two_decimals(base_score * penalty_coefficient)
-        
-        # 创建分值分配记录
-        distribution = ScoreDistribution.objects.create(
+
+        return cls._persist_score_distribution(task, total_score, penalty_coefficient)
+
+    @classmethod
+    @transaction.atomic
+    def _persist_score_distribution(cls, task, total_score, penalty_coefficient):
+        """持久化分值分配（事务内只做写入）"""
+        # 创建或更新分值分配记录（原地 upsert，重算时不再级联删除明细）
+        distribution, _ = ScoreDistribution.objects.update_or_create(
             task=task,
-            total_score=total_score,
-            penalty_coefficient=penalty_coefficient
+            defaults={
+                'total_score': total_score,
+                'penalty_coefficient': penalty_coefficient
+            }
         )
-        
+
         # 计算个人分值分配
         cls._create_score_allocations(distribution, task, total_score)
-        
+
         # 更新累积分值
         cls._update_cumulative_scores(distribution)
-        
+
+        # 重算后失效读取缓存
+        cache.delete(score_distribution_cache_key(task.id))
+
         return distribution
 
     @classmethod
     def _create_score_allocations(cls, distribution, task, total_score):
-        """创建个人分值分配明细"""
-        collaborators = list(task.collaborators.all())
-        
-        if not collaborators:
+        """创建或更新个人分值分配明细
+
+        与已有明细按用户做差量：存量行 bulk_update，新增行 bulk_create，
+        不再参与的行才删除——重复重算不产生整表重写。
+        """
+        collaborator_ids = list(task.collaborators.values_list('id', flat=True))
+
+        if not collaborator_ids:
             # 单人任务：负责人获得100%分值
-            ScoreAllocation.objects.create(
-                distribution=distribution,
-                user=task.owner,
-                base_score=total_score,
-                adjusted_score=total_score,
-                percentage=cls.SINGLE_OWNER_PERCENTAGE
-            )
+            desired = {
+                task.owner_id: (total_score, cls.SINGLE_OWNER_PERCENTAGE),
+            }
         else:
             # 多人任务：负责人50%，协作者平分50%
             owner_score = cls._round_to_two_decimals(
-                total_score * cls.OWNER_PERCENTAGE / 100
+                total_score * cls.OWNER_PERCENTAGE / _HUNDRED
             )
-            
+
             # 协作者总分值 = 总分值 - 负责人分值（确保分值守恒）
             collaborator_total = total_score - owner_score
             collaborator_score = cls._round_to_two_decimals(
-                collaborator_total / len(collaborators)
+                collaborator_total / len(collaborator_ids)
             )
-            
-            # 创建负责人分值分配
-            ScoreAllocation.objects.create(
-                distribution=distribution,
-                user=task.owner,
-                base_score=owner_score,
-                adjusted_score=owner_score,
-                percentage=cls.OWNER_PERCENTAGE
+            collaborator_percentage = cls._COLLAB_PERCENTAGE_CACHE.get(
+                len(collaborator_ids)
+            ) or cls._round_to_two_decimals(
+                cls.COLLABORATOR_PERCENTAGE / len(collaborator_ids)
             )
-            
-            # 创建协作者分值分配
-            collaborator_percentage = cls._round_to_two_decimals(
-                cls.COLLABORATOR_PERCENTAGE / len(collaborators)
+
+            desired = {task.owner_id: (owner_score, cls.OWNER_PERCENTAGE)}
+            desired.update(
+                (collaborator_id, (collaborator_score, collaborator_percentage))
+                for collaborator_id in collaborator_ids
             )
-            
-            for collaborator in collaborators:
-                ScoreAllocation.objects.create(
+
+        existing = {
+            allocation.user_id: allocation
+            for allocation in distribution.allocations.all()
+        }
+
+        to_create = []
+        to_update = []
+        for user_id, (score, percentage) in desired.items():
+            allocation = existing.pop(user_id, None)
+            if allocation is None:
+                to_create.append(ScoreAllocation(
                     distribution=distribution,
-                    user=collaborator,
-                    base_score=collaborator_score,
-                    adjusted_score=collaborator_score,
-                    percentage=collaborator_percentage
-                )
+                    user_id=user_id,
+                    base_score=score,
+                    adjusted_score=score,
+                    percentage=percentage
+                ))
+            else:
+                allocation.base_score = score
+                allocation.adjusted_score = score
+                allocation.percentage = percentage
+                to_update.append(allocation)
+
+        if existing:
+            ScoreAllocation.objects.filter(
+                id__in=[allocation.id for allocation in existing.values()]
+            ).delete()
+        if to_update:
+            ScoreAllocation.objects.bulk_update(
+                to_update, ['base_score', 'adjusted_score', 'percentage']
+            )
+        if to_create:
+            ScoreAllocation.objects.bulk_create(to_create, batch_size=500)
 
     @classmethod
     def _update_cumulative_scores(cls, distribution):
@@ -128,25 +184,50 @@ class TaskScoreService:
         return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
     @classmethod
-    def get_user_monthly_score(cls, user, year, month):
-        """获取用户某月的累积分值"""
-        allocations = ScoreAllocation.objects.filter(
+    def get_user_monthly_stats(cls, user, year, month):
+        """获取用户某月的累积分值和任务数量（一条聚合查询）"""
+        stats = ScoreAllocation.objects.filter(
             user=user,
             distribution__calculated_at__year=year,
             distribution__calculated_at__month=month
-        ).select_related('distribution__task')
-        
-        total_score = sum(allocation.adjusted_score for allocation in allocations)
-        return cls._round_to_two_decimals(total_score)
+        ).aggregate(total=Sum('adjusted_score'), count=Count('id'))
+        return {
+            'total_score': cls._round_to_two_decimals(stats['total'] or Decimal('0')),
+            'task_count': stats['count'],
+        }
 
     @classmethod
-    def get_user_task_count(cls, user, year, month):
-        """获取用户某月完成的任务数量"""
-        return ScoreAllocation.objects.filter(
-            user=user,
+    def get_monthly_stats_for_users(cls, user_ids, year, month):
+        """批量获取多个用户某月的累积分值和任务数量
+
+        一条 GROUP BY 聚合查询代替逐用户调用 get_user_monthly_stats，
+        返回 {user_id: {'total_score': ..., 'task_count': ...}}；
+        没有分配记录的用户不出现在结果中。
+        """
+        rows = ScoreAllocation.objects.filter(
+            user_id__in=user_ids,
             distribution__calculated_at__year=year,
             distribution__calculated_at__month=month
-        ).count()
+        ).values('user_id').annotate(
+            total=Sum('adjusted_score'), count=Count('id')
+        )
+        return {
+            row['user_id']: {
+                'total_score': cls._round_to_two_decimals(row['total']),
+                'task_count': row['count'],
+            }
+            for row in rows
+        }
+
+    @classmethod
+    def get_user_monthly_score(cls, user, year, month):
+        """获取用户某月的累积分值"""
+        return cls.get_user_monthly_stats(user, year, month)['total_score']
+
+    @classmethod
+    def get_user_task_count(cls, user, year, month):
+        """获取用户某月完成的任务数量"""
+        return cls.get_user_monthly_stats(user, year, month)['task_count']
 
     @classmethod
     def recalculate_task_score(cls, task):
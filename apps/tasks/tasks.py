@@ -0,0 +1,115 @@
+"""
+Task background tasks for OKR Performance System
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Task, TaskStatus, ScoreDistribution, ScoreAllocation
+from .services import TaskScoreService, score_distribution_cache_key
+
+
+def calculate_task_score(task_id):
+    """计算单个任务的分值分配
+
+    任务状态流转为完成时通过 transaction.on_commit 调用，
+    把分值计算移出请求事务；接入任务队列（如 Celery）时
+    可直接包装为异步任务。
+    """
+    try:
+        task = Task.objects.get(id=task_id)
+    except Task.DoesNotExist:
+        return
+
+    try:
+        TaskScoreService.calculate_task_score_distribution(task)
+    except ValueError:
+        # 提交后任务又被改回未完成状态，跳过即可
+        pass
+
+
+def recalc_task_scores(task_ids):
+    """批量重算一组已完成任务的分值分配
+
+    管理后台的批量操作通过 transaction.on_commit 调用，
+    把耗时的重算移出请求事务；参数只收可序列化的ID列表，
+    接入任务队列（如 Celery）时可直接包装为异步任务。
+    """
+    completed_tasks = list(
+        Task.objects.filter(id__in=task_ids, status=TaskStatus.COMPLETED)
+        .select_related('owner')
+        .prefetch_related('collaborators')
+    )
+
+    if not completed_tasks:
+        return 0
+
+    with transaction.atomic():
+        # 先批量清掉旧的分值分配，再统一重建
+        ScoreDistribution.objects.filter(task__in=completed_tasks).delete()
+
+        distributions = []
+        allocations = []
+        for task in completed_tasks:
+            penalty_coefficient = (
+                Decimal('0.800') if task.was_ever_postponed() else Decimal('1.000')
+            )
+            total_score = (
+                Decimal(str(task.difficulty_score)) * penalty_coefficient
+            ).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+            distribution = ScoreDistribution(
+                task=task,
+                total_score=total_score,
+                penalty_coefficient=penalty_coefficient
+            )
+            distributions.append(distribution)
+
+            collaborators = list(task.collaborators.all())
+            if not collaborators:
+                # 单人任务：负责人获得100%分值
+                allocations.append(ScoreAllocation(
+                    distribution=distribution,
+                    user=task.owner,
+                    base_score=total_score,
+                    adjusted_score=total_score,
+                    percentage=Decimal('100.00')
+                ))
+            else:
+                # 多人任务：负责人50%，协作者平分50%
+                owner_score = (total_score * Decimal('0.50')).quantize(
+                    Decimal('0.01'), rounding=ROUND_HALF_UP
+                )
+                collaborator_score = (
+                    (total_score - owner_score) / len(collaborators)
+                ).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+                collaborator_percentage = (
+                    Decimal('50.00') / len(collaborators)
+                ).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+                allocations.append(ScoreAllocation(
+                    distribution=distribution,
+                    user=task.owner,
+                    base_score=owner_score,
+                    adjusted_score=owner_score,
+                    percentage=Decimal('50.00')
+                ))
+                for collaborator in collaborators:
+                    allocations.append(ScoreAllocation(
+                        distribution=distribution,
+                        user=collaborator,
+                        base_score=collaborator_score,
+                        adjusted_score=collaborator_score,
+                        percentage=collaborator_percentage
+                    ))
+
+        ScoreDistribution.objects.bulk_create(distributions, batch_size=500)
+        ScoreAllocation.objects.bulk_create(allocations, batch_size=500)
+
+    # 重算后批量失效读取缓存
+    cache.delete_many([
+        score_distribution_cache_key(task.id) for task in completed_tasks
+    ])
+
+    return len(distributions)
@@ -1,12 +1,18 @@
 """
 Task views for OKR Performance System
 """
+from decimal import Decimal
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django_filters import ChoiceFilter, NumberFilter, UUIDFilter
+from django_filters.rest_framework import DjangoFilterBackend, FilterSet
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -17,14 +23,56 @@ from .serializers import (
     TaskStatusUpdateSerializer, ScoreDistributionSerializer, ScoreDistributionSummarySerializer,
     ScoreAllocationSerializer
 )
-from .services import TaskScoreService
+from .services import (
+    TaskScoreService, SCORE_DISTRIBUTION_CACHE_TTL, score_distribution_cache_key
+)
+from .tasks import calculate_task_score
+
+
+# 状态枚举值在导入时绑定一次，Swagger 文档与过滤器共用
+TASK_STATUS_VALUES = [choice[0] for choice in TaskStatus.choices]
+
+
+class TaskFilter(FilterSet):
+    """任务过滤器
+
+    显式声明字段，免去 django-filter 每次请求按 filterset_fields
+    自动推导过滤器类型的开销。
+    """
+    status = ChoiceFilter(choices=TaskStatus.choices)
+    owner = UUIDFilter(field_name='owner_id')
+    difficulty_score = NumberFilter()
+
+    class Meta:
+        model = Task
+        fields = ['status', 'owner', 'difficulty_score']
+
+
+def _collaborator_count_subquery():
+    """协作者数量的中间表子查询注解
+
+    不能直接 annotate(Count('collaborators'))：一旦查询集通过同一个
+    M2M 关系过滤，Django 会复用 JOIN，计数被过滤条件截断；
+    子查询注解与外层查询的 JOIN 结构完全解耦。
+    """
+    through = Task.collaborators.through
+    return Coalesce(
+        Subquery(
+            through.objects.filter(task_id=OuterRef('pk'))
+            .values('task_id')
+            .annotate(c=Count('pk'))
+            .values('c'),
+            output_field=IntegerField()
+        ),
+        0
+    )
 
 
 class TaskViewSet(viewsets.ModelViewSet):
     """任务管理ViewSet"""
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['status', 'owner', 'difficulty_score']
+    filterset_class = TaskFilter
     
     def get_queryset(self):
         """获取当前用户可见的任务"""
@@ -36,11 +84,46 @@ class TaskViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Task.objects.none()
             
-        # 用户可以看到自己作为负责人或协作者的任务
-        return Task.objects.filter(
-            Q(owner=user) | Q(collaborators=user)
-        ).distinct().select_related('owner', 'created_by').prefetch_related('collaborators')
-    
+        # 用户可以看到自己作为负责人或协作者的任务。
+        # 可见性用ID子查询的 UNION 表达，外层查询不再 JOIN 中间表，
+        # 也就无需 distinct() 去重，分页和计数保持索引友好
+        owned_ids = Task.objects.filter(owner_id=user.id).values('id')
+        collab_ids = Task.objects.filter(collaborators__id=user.id).values('id')
+        queryset = TaskSerializer.setup_eager_loading(
+            Task.objects.filter(id__in=owned_ids.union(collab_ids))
+        )
+
+        # 列表类动作需要协作者数量，用子查询注解一次取回；
+        # only() 把列裁到 TaskListSerializer 实际暴露的字段
+        if self.action in ('list', 'by_status'):
+            queryset = queryset.annotate(
+                collaborator_count=_collaborator_count_subquery()
+            ).only(
+                'id', 'title', 'difficulty_score', 'revenue_amount', 'status',
+                'created_at', 'owner__name', 'created_by__id'
+            )
+
+        return queryset
+
+    @staticmethod
+    def _is_participant(task, user):
+        """判断用户是否为任务参与者
+
+        get_queryset 已预取协作者，collaborators.all() 命中预取缓存，
+        比 `user in task.collaborators.all()` 的逐请求 SELECT 少一次查询。
+        """
+        return task.owner_id == user.id or any(
+            collaborator.id == user.id for collaborator in task.collaborators.all()
+        )
+
+    def _hydrate(self, pk):
+        """重新取回任务并预加载响应序列化所需的全部关联
+
+        写入后的实例缺少预取缓存，直接交给 TaskSerializer 会让嵌套
+        用户序列化器逐个补查；统一走这一条带预加载的查询。
+        """
+        return TaskSerializer.setup_eager_loading(Task.objects.all()).get(pk=pk)
+
     def get_serializer_class(self):
         """根据动作选择序列化器"""
         if self.action == 'create':
@@ -85,9 +168,9 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         task = serializer.save()
-        
+
         # 返回完整的任务信息
-        response_serializer = TaskSerializer(task)
+        response_serializer = TaskSerializer(self._hydrate(task.pk))
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
     
     @swagger_auto_schema(
@@ -105,7 +188,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 openapi.IN_QUERY,
                 description="按状态过滤任务",
                 type=openapi.TYPE_STRING,
-                enum=[choice[0] for choice in TaskStatus.choices],
+                enum=TASK_STATUS_VALUES,
                 example="todo"
             ),
             openapi.Parameter(
@@ -162,7 +245,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         
         # 检查权限：只有负责人或协作者可以修改任务
         user = request.user
-        if not (task.owner == user or user in task.collaborators.all()):
+        if not self._is_participant(task, user):
             return Response(
                 {'detail': '只有任务负责人或协作者可以修改任务'},
                 status=status.HTTP_403_FORBIDDEN
@@ -171,9 +254,9 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(task, data=request.data, partial=kwargs.get('partial', False))
         serializer.is_valid(raise_exception=True)
         task = serializer.save()
-        
+
         # 返回完整的任务信息
-        response_serializer = TaskSerializer(task)
+        response_serializer = TaskSerializer(self._hydrate(task.pk))
         return Response(response_serializer.data)
     
     @swagger_auto_schema(
@@ -208,22 +291,26 @@ class TaskViewSet(viewsets.ModelViewSet):
     )
     @action(detail=False, methods=['get'])
     def by_status(self, request):
-        """按状态分组获取任务"""
+        """按状态分组获取任务
+
+        整个查询集走一次 many=True 序列化（共享序列化器实例和 context），
+        再按状态分桶，避免逐行构造 TaskListSerializer；列投影由
+        get_queryset 统一处理。
+        """
         queryset = self.get_queryset()
-        
-        # 按状态分组
+
         grouped_tasks = {
             'todo': [],
             'in_progress': [],
             'completed': [],
             'postponed': []
         }
-        
-        for task in queryset:
-            status_key = task.status
-            if status_key in grouped_tasks:
-                grouped_tasks[status_key].append(TaskListSerializer(task).data)
-        
+
+        for row in TaskListSerializer(queryset, many=True).data:
+            bucket = grouped_tasks.get(row['status'])
+            if bucket is not None:
+                bucket.append(row)
+
         return Response(grouped_tasks)
     
     @swagger_auto_schema(
@@ -246,21 +333,32 @@ class TaskViewSet(viewsets.ModelViewSet):
     )
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """获取用户的任务统计"""
+        """获取用户的任务统计
+
+        条件聚合一次扫描算出全部计数，代替此前7条独立的 COUNT 查询；
+        distinct 计数抵消可见性过滤的 M2M JOIN 带来的行膨胀。
+        """
         user = request.user
-        queryset = self.get_queryset()
-        
-        # 计算统计数据
-        stats = {
-            'total_tasks': queryset.count(),
-            'owned_tasks': queryset.filter(owner=user).count(),
-            'collaborated_tasks': queryset.filter(collaborators=user).exclude(owner=user).count(),
-            'completed_tasks': queryset.filter(status=TaskStatus.COMPLETED).count(),
-            'in_progress_tasks': queryset.filter(status=TaskStatus.IN_PROGRESS).count(),
-            'todo_tasks': queryset.filter(status=TaskStatus.TODO).count(),
-            'postponed_tasks': queryset.filter(status=TaskStatus.POSTPONED).count(),
-        }
-        
+        stats = self.get_queryset().aggregate(
+            total_tasks=Count('id', distinct=True),
+            owned_tasks=Count('id', filter=Q(owner_id=user.id), distinct=True),
+            collaborated_tasks=Count(
+                'id',
+                filter=Q(collaborators__id=user.id) & ~Q(owner_id=user.id),
+                distinct=True
+            ),
+            completed_tasks=Count(
+                'id', filter=Q(status=TaskStatus.COMPLETED), distinct=True
+            ),
+            in_progress_tasks=Count(
+                'id', filter=Q(status=TaskStatus.IN_PROGRESS), distinct=True
+            ),
+            todo_tasks=Count('id', filter=Q(status=TaskStatus.TODO), distinct=True),
+            postponed_tasks=Count(
+                'id', filter=Q(status=TaskStatus.POSTPONED), distinct=True
+            ),
+        )
+
         return Response(stats)
     
     @swagger_auto_schema(
@@ -280,7 +378,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         user = request.user
         
         # 检查权限：只有负责人或协作者可以修改任务状态
-        if not (task.owner == user or user in task.collaborators.all()):
+        if not self._is_participant(task, user):
             return Response(
                 {'detail': '只有任务负责人或协作者可以修改任务状态'},
                 status=status.HTTP_403_FORBIDDEN
@@ -291,36 +389,46 @@ class TaskViewSet(viewsets.ModelViewSet):
         
         new_status = serializer.validated_data['status']
         postpone_reason = serializer.validated_data.get('postpone_reason', '')
-        
-        # 记录状态转换时间戳
-        now = timezone.now()
-        
-        if new_status == TaskStatus.IN_PROGRESS and task.status != TaskStatus.IN_PROGRESS:
-            task.started_at = now
-        elif new_status == TaskStatus.COMPLETED and task.status != TaskStatus.COMPLETED:
-            task.completed_at = now
-        elif new_status == TaskStatus.POSTPONED and task.status != TaskStatus.POSTPONED:
-            task.postponed_at = now
-            task.postpone_reason = postpone_reason
-        
-        # 更新状态
-        task.status = new_status
-        
-        # 如果不是推迟状态，清空推迟原因
-        if new_status != TaskStatus.POSTPONED:
-            task.postpone_reason = ''
-        
-        task.save()
-        
-        # 如果任务状态变为完成，自动计算分值分配
-        if new_status == TaskStatus.COMPLETED:
-            try:
-                TaskScoreService.calculate_task_score_distribution(task)
-            except Exception as e:
-                # 记录错误但不影响状态更新
-                pass
-        
-        # 返回更新后的任务信息
+
+        _STATUS_FIELDS = (
+            'status', 'started_at', 'completed_at', 'postponed_at', 'postpone_reason'
+        )
+
+        # 行锁串行化并发的状态流转，时间戳分支基于锁定后的最新状态判断；
+        # update_fields 把 UPDATE 限定在实际变动的5列
+        with transaction.atomic():
+            locked = Task.objects.select_for_update().get(pk=task.pk)
+
+            # 记录状态转换时间戳
+            now = timezone.now()
+
+            if new_status == TaskStatus.IN_PROGRESS and locked.status != TaskStatus.IN_PROGRESS:
+                locked.started_at = now
+            elif new_status == TaskStatus.COMPLETED and locked.status != TaskStatus.COMPLETED:
+                locked.completed_at = now
+            elif new_status == TaskStatus.POSTPONED and locked.status != TaskStatus.POSTPONED:
+                locked.postponed_at = now
+                locked.postpone_reason = postpone_reason
+
+            # 更新状态
+            locked.status = new_status
+
+            # 如果不是推迟状态，清空推迟原因
+            if new_status != TaskStatus.POSTPONED:
+                locked.postpone_reason = ''
+
+            locked.save(update_fields=_STATUS_FIELDS)
+
+            # 任务完成后的自动分值计算移出请求路径，事务提交后执行，
+            # PATCH 响应不再等待整套分配计算
+            if new_status == TaskStatus.COMPLETED:
+                task_id = task.id
+                transaction.on_commit(lambda: calculate_task_score(task_id))
+
+        # 把变动的列同步回带预取缓存的实例，序列化响应不再补查关联
+        for field in _STATUS_FIELDS:
+            setattr(task, field, getattr(locked, field))
+
         response_serializer = TaskSerializer(task)
         return Response(response_serializer.data)
 
@@ -340,7 +448,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         user = request.user
         
         # 检查权限：只有负责人或协作者可以计算分值
-        if not (task.owner == user or user in task.collaborators.all()):
+        if not self._is_participant(task, user):
             return Response(
                 {'detail': '只有任务负责人或协作者可以计算分值分配'},
                 status=status.HTTP_403_FORBIDDEN
@@ -367,16 +475,25 @@ class TaskViewSet(viewsets.ModelViewSet):
     def score_distribution(self, request, pk=None):
         """获取任务分值分配"""
         task = self.get_object()
-        
-        try:
-            distribution = task.score_distribution
-            serializer = ScoreDistributionSerializer(distribution)
-            return Response(serializer.data)
-        except ScoreDistribution.DoesNotExist:
-            return Response(
-                {'detail': '该任务尚未计算分值分配'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+
+        # 序列化结果做短时缓存，重算时由服务层主动失效
+        cache_key = score_distribution_cache_key(task.id)
+        data = cache.get(cache_key)
+        if data is None:
+            # 一对一访问会整行取回且嵌套序列化器逐行补查关联，
+            # 改用带预加载的查询一次取齐任务、参与者和分配明细
+            distribution = ScoreDistributionSerializer.setup_eager_loading(
+                ScoreDistribution.objects.filter(task=task)
+            ).first()
+            if distribution is None:
+                return Response(
+                    {'detail': '该任务尚未计算分值分配'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            data = ScoreDistributionSerializer(distribution).data
+            cache.set(cache_key, data, SCORE_DISTRIBUTION_CACHE_TTL)
+
+        return Response(data)
 
 
 class ScoreDistributionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -396,9 +513,19 @@ class ScoreDistributionViewSet(viewsets.ReadOnlyModelViewSet):
             return ScoreDistribution.objects.none()
             
         # 用户可以看到自己参与的任务的分值分配
-        return ScoreDistribution.objects.filter(
-            Q(task__owner=user) | Q(task__collaborators=user)
-        ).distinct().select_related('task').prefetch_related('allocations__user')
+        queryset = ScoreDistributionSerializer.setup_eager_loading(
+            ScoreDistribution.objects.filter(
+                Q(task__owner_id=user.id) | Q(task__collaborators__id=user.id)
+            ).distinct()
+        )
+
+        # 列表页需要明细数量，distinct 计数不受 M2M 过滤 JOIN 的行膨胀影响
+        if self.action == 'list':
+            queryset = queryset.annotate(
+                allocation_count=Count('allocations', distinct=True)
+            )
+
+        return queryset
     
     def get_serializer_class(self):
         """根据动作选择序列化器"""
@@ -443,7 +570,7 @@ class ScoreAllocationViewSet(viewsets.ReadOnlyModelViewSet):
         if not user.is_authenticated:
             return ScoreAllocation.objects.none()
             
-        return ScoreAllocation.objects.filter(user=user).select_related(
+        return ScoreAllocation.objects.filter(user_id=user.id).select_related(
             'distribution__task', 'user'
         ).order_by('-distribution__calculated_at')
     
@@ -497,24 +624,28 @@ class ScoreAllocationViewSet(viewsets.ReadOnlyModelViewSet):
         year = int(request.query_params.get('year', now.year))
         month = int(request.query_params.get('month', now.month))
         
-        # 获取该月的分值分配
-        allocations = ScoreAllocation.objects.filter(
-            user=user,
+        # 获取该月的分值分配（复用视图查询集，JOIN 与列表端点保持一致）
+        allocations = self.get_queryset().filter(
             distribution__calculated_at__year=year,
             distribution__calculated_at__month=month
-        ).select_related('distribution__task')
-        
-        # 计算统计数据
-        total_score = TaskScoreService.get_user_monthly_score(user, year, month)
-        task_count = TaskScoreService.get_user_task_count(user, year, month)
+        )
         
+        # 统计数据来自同一组行：一条条件聚合代替原先两次独立的服务层查询
+        agg = allocations.aggregate(
+            total=Sum('adjusted_score'),
+            tasks=Count('distribution_id', distinct=True)
+        )
+        total_score = TaskScoreService._round_to_two_decimals(
+            agg['total'] or Decimal('0')
+        )
+
         # 序列化分配明细
         allocation_data = ScoreAllocationSerializer(allocations, many=True).data
-        
+
         return Response({
             'year': year,
             'month': month,
             'total_score': str(total_score),
-            'task_count': task_count,
+            'task_count': agg['tasks'],
             'allocations': allocation_data
         })
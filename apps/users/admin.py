@@ -1,10 +1,41 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils import timezone
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import User, Department
 
+# 部门/角色/状态徽标在导入时构造好，改动列表的单元格改为查表返回，
+# 免去每行每列的 format_html 格式化与转义
+_DEPT_COLORS = {
+    Department.HARDWARE: '#FF6B6B',  # 红色
+    Department.SOFTWARE: '#4ECDC4',  # 青色
+    Department.MARKETING: '#45B7D1',  # 蓝色
+}
+_DEPT_HTML = {
+    value: format_html(
+        '<span style="color: {}; font-weight: bold;">{}</span>',
+        _DEPT_COLORS.get(value, '#6C757D'),
+        label
+    )
+    for value, label in Department.choices
+}
+_ROLE_ICONS = {'admin': ('#DC3545', '👑'), 'member': ('#6C757D', '👤')}
+_ROLE_HTML = {
+    value: format_html(
+        '<span style="color: {};">{} {}</span>',
+        _ROLE_ICONS.get(value, ('#6C757D', '👤'))[0],
+        _ROLE_ICONS.get(value, ('#6C757D', '👤'))[1],
+        label
+    )
+    for value, label in User._meta.get_field('role').choices
+}
+_STATUS_HTML = {
+    True: mark_safe('<span style="color: #28A745; font-weight: bold;">✓ 激活</span>'),
+    False: mark_safe('<span style="color: #DC3545; font-weight: bold;">✗ 停用</span>'),
+}
+
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -92,49 +123,42 @@ class UserAdmin(BaseUserAdmin):
     
     # 只读字段
     readonly_fields = ('created_at', 'updated_at', 'last_login', 'date_joined')
+
+    def get_fieldsets(self, request, obj=None):
+        """字段分组是静态配置，直接返回类属性
+
+        跳过父类实现里每次请求对 fieldsets 元组的遍历与拷贝。
+        """
+        return self.add_fieldsets if obj is None else self.fieldsets
     
     # 自定义显示方法
     def get_department_display(self, obj):
         """显示部门信息，带颜色标识"""
-        colors = {
-            'hardware': '#FF6B6B',  # 红色
-            'software': '#4ECDC4',  # 青色  
-            'marketing': '#45B7D1'  # 蓝色
-        }
-        color = colors.get(obj.department, '#6C757D')
-        return format_html(
-            '<span style="color: {}; font-weight: bold;">{}</span>',
-            color,
-            obj.get_department_display()
-        )
+        html = _DEPT_HTML.get(obj.department)
+        if html is None:
+            html = format_html(
+                '<span style="color: #6C757D; font-weight: bold;">{}</span>',
+                obj.get_department_display()
+            )
+        return html
     get_department_display.short_description = '部门'
     get_department_display.admin_order_field = 'department'
-    
+
     def get_role_display(self, obj):
         """显示角色信息，带图标"""
-        if obj.role == 'admin':
-            return format_html(
-                '<span style="color: #DC3545;">👑 {}</span>',
-                obj.get_role_display()
-            )
-        else:
-            return format_html(
+        html = _ROLE_HTML.get(obj.role)
+        if html is None:
+            html = format_html(
                 '<span style="color: #6C757D;">👤 {}</span>',
                 obj.get_role_display()
             )
+        return html
     get_role_display.short_description = '角色'
     get_role_display.admin_order_field = 'role'
-    
+
     def get_status_display(self, obj):
         """显示用户状态，带颜色标识"""
-        if obj.is_active:
-            return format_html(
-                '<span style="color: #28A745; font-weight: bold;">✓ 激活</span>'
-            )
-        else:
-            return format_html(
-                '<span style="color: #DC3545; font-weight: bold;">✗ 停用</span>'
-            )
+        return _STATUS_HTML[bool(obj.is_active)]
     get_status_display.short_description = '状态'
     get_status_display.admin_order_field = 'is_active'
     
@@ -142,20 +166,24 @@ class UserAdmin(BaseUserAdmin):
     actions = ['activate_users', 'deactivate_users', 'reset_passwords']
     
     def activate_users(self, request, queryset):
-        """批量激活用户"""
-        updated = queryset.update(is_active=True)
+        """批量激活用户（单条 UPDATE；update() 绕过 auto_now，手动补时间戳）"""
+        updated = queryset.update(is_active=True, updated_at=timezone.now())
         self.message_user(request, f'成功激活 {updated} 个用户账户。')
     activate_users.short_description = "激活选中的用户"
-    
+
     def deactivate_users(self, request, queryset):
-        """批量停用用户"""
-        updated = queryset.update(is_active=False)
+        """批量停用用户（单条 UPDATE；update() 绕过 auto_now，手动补时间戳）"""
+        updated = queryset.update(is_active=False, updated_at=timezone.now())
         self.message_user(request, f'成功停用 {updated} 个用户账户。')
     deactivate_users.short_description = "停用选中的用户"
     
     def reset_passwords(self, request, queryset):
         """批量重置密码提醒"""
-        count = queryset.count()
+        # 查询集已被物化时直接用缓存长度，省一次 COUNT(*) 往返
+        if queryset._result_cache is not None:
+            count = len(queryset)
+        else:
+            count = queryset.count()
         self.message_user(
             request, 
             f'已选择 {count} 个用户进行密码重置。请手动为这些用户设置新密码。',
@@ -164,43 +192,60 @@ class UserAdmin(BaseUserAdmin):
     reset_passwords.short_description = "标记选中用户需要重置密码"
     
     # 权限控制
+    @staticmethod
+    def _admin_flags(request):
+        """当前请求用户的 (超级管理员, 系统管理员) 标志
+
+        改动列表每行都要做权限判断，标志在请求对象上记忆化，
+        避免重复的 hasattr/属性链访问。
+        """
+        flags = getattr(request, '_okr_admin_flags', None)
+        if flags is None:
+            user = request.user
+            flags = (user.is_superuser, getattr(user, 'role', None) == 'admin')
+            request._okr_admin_flags = flags
+        return flags
+
     def has_add_permission(self, request):
         """只有管理员可以添加用户"""
-        return request.user.is_superuser or (
-            hasattr(request.user, 'role') and request.user.role == 'admin'
-        )
-    
+        is_super, is_admin = self._admin_flags(request)
+        return is_super or is_admin
+
     def has_change_permission(self, request, obj=None):
         """管理员可以修改所有用户，普通用户只能修改自己"""
-        if request.user.is_superuser:
-            return True
-        if hasattr(request.user, 'role') and request.user.role == 'admin':
+        is_super, is_admin = self._admin_flags(request)
+        if is_super or is_admin:
             return True
         if obj is not None:
             return obj == request.user
         return False
-    
+
     def has_delete_permission(self, request, obj=None):
         """只有超级管理员可以删除用户"""
-        return request.user.is_superuser
+        return self._admin_flags(request)[0]
     
     def get_queryset(self, request):
-        """根据用户权限过滤查询集"""
-        qs = super().get_queryset(request)
-        if request.user.is_superuser:
-            return qs
-        elif hasattr(request.user, 'role') and request.user.role == 'admin':
+        """根据用户权限过滤查询集
+
+        only() 只取改动列表实际渲染的列，密码哈希等宽字段不再随行传输；
+        没有外键列，无需 list_select_related。
+        """
+        qs = super().get_queryset(request).only(
+            'id', 'email', 'name', 'department', 'role',
+            'is_active', 'last_login', 'created_at', 'is_superuser'
+        )
+        is_super, is_admin = self._admin_flags(request)
+        if is_super or is_admin:
             return qs
-        else:
-            # 普通用户只能看到自己
-            return qs.filter(id=request.user.id)
+        # 普通用户只能看到自己
+        return qs.filter(id=request.user.id)
     
     def get_form(self, request, obj=None, **kwargs):
         """根据用户权限自定义表单"""
         form = super().get_form(request, obj, **kwargs)
         
         # 非超级管理员不能修改超级用户权限
-        if not request.user.is_superuser:
+        if not self._admin_flags(request)[0]:
             if 'is_superuser' in form.base_fields:
                 form.base_fields['is_superuser'].disabled = True
             if 'is_staff' in form.base_fields and obj and obj.is_superuser:
@@ -6,6 +6,10 @@ from django.contrib.auth.password_validation import validate_password
 from .models import User, Department
 from apps.reports.models import WorkHours
 
+# 部门选项在导入时绑定一次，校验时不再逐次重建字典
+_DEPARTMENT_CHOICES = dict(Department.choices)
+_DEPARTMENT_CHOICES_HINT = ', '.join(_DEPARTMENT_CHOICES)
+
 
 class UserSerializer(serializers.ModelSerializer):
     """用户序列化器"""
@@ -51,12 +55,12 @@ class UserCreateSerializer(serializers.ModelSerializer):
     
     def validate_department(self, value):
         """验证部门选项"""
-        if value not in dict(Department.choices):
+        if value not in _DEPARTMENT_CHOICES:
             raise serializers.ValidationError(
-                f'无效的部门选项。可选值: {", ".join(dict(Department.choices).keys())}'
+                f'无效的部门选项。可选值: {_DEPARTMENT_CHOICES_HINT}'
             )
         return value
-    
+
     def create(self, validated_data):
         """创建用户"""
         # Remove password_confirm from validated_data
@@ -87,9 +91,9 @@ class UserUpdateSerializer(serializers.ModelSerializer):
     
     def validate_department(self, value):
         """验证部门选项"""
-        if value not in dict(Department.choices):
+        if value not in _DEPARTMENT_CHOICES:
             raise serializers.ValidationError(
-                f'无效的部门选项。可选值: {", ".join(dict(Department.choices).keys())}'
+                f'无效的部门选项。可选值: {_DEPARTMENT_CHOICES_HINT}'
             )
         return value
 
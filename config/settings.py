@@ -30,6 +30,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third Party Apps
     'rest_framework',
@@ -89,6 +90,9 @@ DATABASES = {
     }
 }
 
+# Test Runner (reuses the test database between runs; RECREATE_TEST_DB=1 to rebuild)
+TEST_RUNNER = 'config.test_runner.ReuseDBRunner'
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -0,0 +1,20 @@
+"""
+Test runner for OKR Performance System
+"""
+import os
+
+from django.test.runner import DiscoverRunner
+
+
+class ReuseDBRunner(DiscoverRunner):
+    """默认复用测试数据库的测试运行器
+
+    等价于 pytest-django 的 --reuse-db：跳过每次运行的建库/删库开销，
+    未应用的迁移在复用时仍会自动执行。
+    设置环境变量 RECREATE_TEST_DB=1 可强制重建测试数据库。
+    """
+
+    def __init__(self, **kwargs):
+        if not os.environ.get('RECREATE_TEST_DB'):
+            kwargs['keepdb'] = True
+        super().__init__(**kwargs)
@@ -0,0 +1,34 @@
+"""
+Test settings for OKR Performance System
+
+用法: python manage.py test --settings=config.test_settings
+"""
+from django.db.backends.signals import connection_created
+
+from .settings import *  # noqa: F401,F403
+
+# 测试从不校验密码（统一用 force_authenticate），
+# 换成MD5哈希器省掉每次 create_user 几十毫秒的PBKDF2计算
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# 测试库用内存SQLite，事务/保存点不再落盘
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+
+def _tune_sqlite(sender, connection, **kwargs):
+    """SQLite 连接级调优：测试库可随时重建，关掉同步写与磁盘日志"""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous=OFF')
+            cursor.execute('PRAGMA journal_mode=MEMORY')
+            cursor.execute('PRAGMA temp_store=MEMORY')
+
+
+connection_created.connect(_tune_sqlite)